@@ -0,0 +1,38 @@
+"""
+migrations/env.py - Alembic environment for the metadata repository
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from repository import get_engine
+from repository.metadata.models import ModelBase
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = ModelBase.metadata
+
+
+def run_migrations_offline():
+    context.configure(url=str(get_engine().url), target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with get_engine().connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,39 @@
+"""
+Add numeric run_key and (parent id, run_key) index to the log tables
+
+Revision ID: a1c0e5d2f801
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a1c0e5d2f801'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# log table -> column with the id of the definition it belongs to
+log_tables = {'import_ods_log': 'source_id',
+              'import_stage_log': 'source_id',
+              'import_file_download_log': 'source_id',
+              'data_warehouse_df_log': 'dw_id',
+              'data_warehouse_ar_log': 'dw_id',
+              'export_log': 'export_id'}
+
+
+def upgrade():
+    # run ids of up to 18 digits always fit in a BIGINT - longer ones are set by the run_key trigger revision
+    numeric_run_id = ("run_id ~ '^[0-9]{1,18}$'" if op.get_bind().dialect.name == 'postgresql' else
+                      "run_id NOT GLOB '*[^0-9]*' AND run_id <> '' AND length(run_id) <= 18")
+    for table_name, parent_column in log_tables.items():
+        op.add_column(table_name, sa.Column('run_key', sa.BigInteger()))
+        op.execute("UPDATE {0} SET run_key = CAST(run_id AS BIGINT) WHERE {1}".format(table_name, numeric_run_id))
+        op.create_index('ix_{0}_{1}_run_key'.format(table_name, parent_column), table_name,
+                        [parent_column, 'run_key'])
+
+
+def downgrade():
+    for table_name, parent_column in log_tables.items():
+        op.drop_index('ix_{0}_{1}_run_key'.format(table_name, parent_column), table_name=table_name)
+        op.drop_column(table_name, 'run_key')
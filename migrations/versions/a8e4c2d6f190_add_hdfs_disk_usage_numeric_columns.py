@@ -0,0 +1,65 @@
+"""
+Add numeric quota columns to hdfs_disk_usage and backfill them from the string columns
+
+Revision ID: a8e4c2d6f190
+Revises: f3c9a7e1b254
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a8e4c2d6f190'
+down_revision = 'f3c9a7e1b254'
+branch_labels = None
+depends_on = None
+
+backfill_chunk_size = 10000
+numeric_columns = {'name_quota': 'quota',
+                   'space_quota_bytes': 'space_quota',
+                   'space_consumed_bytes': 'space_consumed'}
+
+
+def to_number(value):
+    """Numeric value of a quota string - None for none, inf or anything else that is not an integer"""
+    try:
+        return int(value.strip())
+    except (AttributeError, ValueError):
+        return None
+
+
+def upgrade():
+    with op.batch_alter_table('hdfs_disk_usage') as batch_op:
+        for column_name in sorted(numeric_columns):
+            batch_op.add_column(sa.Column(column_name, sa.BigInteger()))
+    op.create_index('ix_hdfs_disk_usage_path_create_dt', 'hdfs_disk_usage', ['path', 'create_dt'])
+
+    # backfill in id order a chunk at a time so the table is never read into memory in one piece
+    table = sa.table('hdfs_disk_usage', sa.column('id', sa.Integer),
+                     *[sa.column(name, sa.String) for name in numeric_columns.values()] +
+                     [sa.column(name, sa.BigInteger) for name in numeric_columns])
+    connection = op.get_bind()
+    update = (sa.update(table).where(table.c.id == sa.bindparam('row_id'))
+              .values(**dict((name, sa.bindparam(name)) for name in numeric_columns)))
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.select(table.c.id, *[table.c[name] for name in numeric_columns.values()])
+                                  .where(table.c.id > last_id).order_by(table.c.id)
+                                  .limit(backfill_chunk_size)).fetchall()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            value = dict((name, to_number(getattr(row, source))) for name, source in numeric_columns.items())
+            if any(number is not None for number in value.values()):
+                value['row_id'] = row.id
+                values.append(value)
+        if values:
+            connection.execute(update, values)
+        last_id = rows[-1].id
+
+
+def downgrade():
+    op.drop_index('ix_hdfs_disk_usage_path_create_dt', table_name='hdfs_disk_usage')
+    with op.batch_alter_table('hdfs_disk_usage') as batch_op:
+        for column_name in sorted(numeric_columns):
+            batch_op.drop_column(column_name)
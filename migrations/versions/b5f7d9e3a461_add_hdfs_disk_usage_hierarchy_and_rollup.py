@@ -0,0 +1,87 @@
+"""
+Add path hierarchy columns to hdfs_disk_usage and the hdfs_disk_usage_rollup table
+
+Run HdfsDiskUsageOperator().rebuild_rollups() once after upgrading to roll up the existing snapshots.
+
+Revision ID: b5f7d9e3a461
+Revises: a8e4c2d6f190
+Create Date: 2026-10-18
+"""
+import posixpath
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b5f7d9e3a461'
+down_revision = 'a8e4c2d6f190'
+branch_labels = None
+depends_on = None
+
+backfill_chunk_size = 10000
+
+
+def path_hierarchy(path):
+    """Depth and parent directory of a path - / has depth 0 and no parent"""
+    path = (path or '').rstrip('/') or '/'
+    if path == '/':
+        return 0, None
+    return path.count('/'), posixpath.dirname(path)
+
+
+def upgrade():
+    with op.batch_alter_table('hdfs_disk_usage') as batch_op:
+        batch_op.add_column(sa.Column('path_depth', sa.Integer()))
+        batch_op.add_column(sa.Column('parent_path', sa.String(300)))
+    op.create_index('ix_hdfs_disk_usage_parent_path_create_dt', 'hdfs_disk_usage', ['parent_path', 'create_dt'])
+    op.create_index('ix_hdfs_disk_usage_path_prefix', 'hdfs_disk_usage', ['path'],
+                    postgresql_ops={'path': 'varchar_pattern_ops'})
+    op.create_table('hdfs_disk_usage_rollup',
+                    sa.Column('id', sa.Integer(), primary_key=True),
+                    sa.Column('created_dttm', sa.DateTime()),
+                    sa.Column('period', sa.String(10)),
+                    sa.Column('period_start_dt', sa.Date()),
+                    sa.Column('path', sa.String(300)),
+                    sa.Column('path_depth', sa.Integer()),
+                    sa.Column('parent_path', sa.String(300)),
+                    sa.Column('snapshot_count', sa.Integer()),
+                    sa.Column('last_dt', sa.Date()),
+                    sa.Column('directory_count', sa.Integer()),
+                    sa.Column('file_count', sa.Integer()),
+                    sa.Column('length', sa.BigInteger()),
+                    sa.Column('space_consumed_bytes', sa.BigInteger()),
+                    sa.Column('max_length', sa.BigInteger()),
+                    sa.Column('avg_length', sa.BigInteger()))
+    op.create_index('ix_hdfs_disk_usage_rollup_period_path', 'hdfs_disk_usage_rollup',
+                    ['period', 'path', 'period_start_dt'], unique=True)
+    op.create_index('ix_hdfs_disk_usage_rollup_period_parent_path', 'hdfs_disk_usage_rollup',
+                    ['period', 'parent_path', 'period_start_dt'])
+
+    # backfill in id order a chunk at a time so the table is never read into memory in one piece
+    table = sa.table('hdfs_disk_usage', sa.column('id', sa.Integer), sa.column('path', sa.String),
+                     sa.column('path_depth', sa.Integer), sa.column('parent_path', sa.String))
+    connection = op.get_bind()
+    update = (sa.update(table).where(table.c.id == sa.bindparam('row_id'))
+              .values(path_depth=sa.bindparam('path_depth'), parent_path=sa.bindparam('parent_path')))
+    last_id = 0
+    while True:
+        rows = connection.execute(sa.select(table.c.id, table.c.path).where(table.c.id > last_id)
+                                  .order_by(table.c.id).limit(backfill_chunk_size)).fetchall()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            path_depth, parent_path = path_hierarchy(row.path)
+            values.append({'row_id': row.id, 'path_depth': path_depth, 'parent_path': parent_path})
+        connection.execute(update, values)
+        last_id = rows[-1].id
+
+
+def downgrade():
+    op.drop_index('ix_hdfs_disk_usage_rollup_period_parent_path', table_name='hdfs_disk_usage_rollup')
+    op.drop_index('ix_hdfs_disk_usage_rollup_period_path', table_name='hdfs_disk_usage_rollup')
+    op.drop_table('hdfs_disk_usage_rollup')
+    op.drop_index('ix_hdfs_disk_usage_path_prefix', table_name='hdfs_disk_usage')
+    op.drop_index('ix_hdfs_disk_usage_parent_path_create_dt', table_name='hdfs_disk_usage')
+    with op.batch_alter_table('hdfs_disk_usage') as batch_op:
+        batch_op.drop_column('parent_path')
+        batch_op.drop_column('path_depth')
@@ -0,0 +1,25 @@
+"""
+Add indexes for the file download to stage load anti-join
+
+Revision ID: b7d3f9a4c612
+Revises: a1c0e5d2f801
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'b7d3f9a4c612'
+down_revision = 'a1c0e5d2f801'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_import_stage_log_source_id_run_id_name', 'import_stage_log',
+                    ['source_id', 'run_id', 'realized_source_name'])
+    op.create_index('ix_import_file_download_log_status_source_id', 'import_file_download_log',
+                    ['status', 'source_id'])
+
+
+def downgrade():
+    op.drop_index('ix_import_file_download_log_status_source_id', table_name='import_file_download_log')
+    op.drop_index('ix_import_stage_log_source_id_run_id_name', table_name='import_stage_log')
@@ -0,0 +1,35 @@
+"""
+Add claimed_by and lease_expires_dttm to the log tables for work claiming
+
+Revision ID: c4e8a2b1d937
+Revises: b7d3f9a4c612
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c4e8a2b1d937'
+down_revision = 'b7d3f9a4c612'
+branch_labels = None
+depends_on = None
+
+log_tables = ['import_ods_log', 'import_stage_log', 'import_file_download_log', 'data_warehouse_df_log',
+              'data_warehouse_ar_log', 'export_log']
+# tables polled for work get a (status, id) index for the claim query
+queue_tables = ['import_stage_log', 'import_file_download_log']
+
+
+def upgrade():
+    for table_name in log_tables:
+        op.add_column(table_name, sa.Column('claimed_by', sa.String(100)))
+        op.add_column(table_name, sa.Column('lease_expires_dttm', sa.DateTime()))
+    for table_name in queue_tables:
+        op.create_index('ix_{0}_status_id'.format(table_name), table_name, ['status', 'id'])
+
+
+def downgrade():
+    for table_name in queue_tables:
+        op.drop_index('ix_{0}_status_id'.format(table_name), table_name=table_name)
+    for table_name in log_tables:
+        op.drop_column(table_name, 'lease_expires_dttm')
+        op.drop_column(table_name, 'claimed_by')
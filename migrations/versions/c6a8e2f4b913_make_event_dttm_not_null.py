@@ -0,0 +1,27 @@
+"""
+Make event.event_dttm not null so the event table can be partitioned on it
+
+Events without an event_dttm get their created_dttm, or the current time when that is missing too.
+
+Revision ID: c6a8e2f4b913
+Revises: b5f7d9e3a461
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'c6a8e2f4b913'
+down_revision = 'b5f7d9e3a461'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("UPDATE event SET event_dttm = COALESCE(created_dttm, CURRENT_TIMESTAMP) WHERE event_dttm IS NULL")
+    with op.batch_alter_table('event') as batch_op:
+        batch_op.alter_column('event_dttm', existing_type=sa.DateTime(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('event') as batch_op:
+        batch_op.alter_column('event_dttm', existing_type=sa.DateTime(), nullable=True)
@@ -0,0 +1,26 @@
+"""
+Add event_dttm and (event_category, event_group, event_dttm) indexes to event
+
+The event table can afterwards be converted to monthly range partitions on PostgreSQL with
+repository.utils.partition_utils.partition_table (see README).
+
+Revision ID: d2a6c8e0f413
+Revises: c4e8a2b1d937
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'd2a6c8e0f413'
+down_revision = 'c4e8a2b1d937'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_event_event_dttm', 'event', ['event_dttm'])
+    op.create_index('ix_event_category_group_dttm', 'event', ['event_category', 'event_group', 'event_dttm'])
+
+
+def downgrade():
+    op.drop_index('ix_event_category_group_dttm', table_name='event')
+    op.drop_index('ix_event_event_dttm', table_name='event')
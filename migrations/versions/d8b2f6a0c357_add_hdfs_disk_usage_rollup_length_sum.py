@@ -0,0 +1,26 @@
+"""
+Add hdfs_disk_usage_rollup.length_sum so avg_length can be maintained incrementally as days are loaded
+
+Existing rollups get avg_length * snapshot_count - the periods recomputed later get the exact sum.
+
+Revision ID: d8b2f6a0c357
+Revises: c6a8e2f4b913
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd8b2f6a0c357'
+down_revision = 'c6a8e2f4b913'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('hdfs_disk_usage_rollup', sa.Column('length_sum', sa.BigInteger(), nullable=True))
+    op.execute("UPDATE hdfs_disk_usage_rollup SET length_sum = avg_length * snapshot_count")
+
+
+def downgrade():
+    with op.batch_alter_table('hdfs_disk_usage_rollup') as batch_op:
+        batch_op.drop_column('length_sum')
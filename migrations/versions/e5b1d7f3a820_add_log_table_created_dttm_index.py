@@ -0,0 +1,26 @@
+"""
+Add created_dttm index to the log tables for retention purges
+
+Revision ID: e5b1d7f3a820
+Revises: d2a6c8e0f413
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'e5b1d7f3a820'
+down_revision = 'd2a6c8e0f413'
+branch_labels = None
+depends_on = None
+
+log_tables = ['import_ods_log', 'import_stage_log', 'import_file_download_log', 'data_warehouse_df_log',
+              'data_warehouse_ar_log', 'export_log']
+
+
+def upgrade():
+    for table_name in log_tables:
+        op.create_index('ix_{0}_created_dttm'.format(table_name), table_name, ['created_dttm'])
+
+
+def downgrade():
+    for table_name in log_tables:
+        op.drop_index('ix_{0}_created_dttm'.format(table_name), table_name=table_name)
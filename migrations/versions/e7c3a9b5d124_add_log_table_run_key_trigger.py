@@ -0,0 +1,59 @@
+"""
+Set log table run_key from run_id with a trigger so rows inserted outside the ORM are indexed
+
+run_key is recomputed for every row: rows written with raw SQL or by other services have no run_key yet.
+
+Revision ID: e7c3a9b5d124
+Revises: d8b2f6a0c357
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+revision = 'e7c3a9b5d124'
+down_revision = 'd8b2f6a0c357'
+branch_labels = None
+depends_on = None
+
+log_tables = ['import_ods_log', 'import_stage_log', 'import_file_download_log', 'data_warehouse_df_log',
+              'data_warehouse_ar_log', 'export_log']
+
+# run_key of a run_id expression - NULL when the run id is not numeric or does not fit in a BIGINT
+run_key_sql = {'postgresql': "CASE WHEN btrim({0}) ~ '^[0-9]{{1,19}}$' AND (length(btrim({0})) < 19 OR "
+                             "btrim({0}) COLLATE \"C\" <= '9223372036854775807') THEN CAST(btrim({0}) AS BIGINT) END",
+               'sqlite': "CASE WHEN trim({0}) <> '' AND trim({0}) NOT GLOB '*[^0-9]*' AND (length(trim({0})) < 19 OR "
+                         "(length(trim({0})) = 19 AND trim({0}) <= '9223372036854775807')) "
+                         "THEN CAST(trim({0}) AS INTEGER) END"}
+
+
+def upgrade():
+    dialect_name = op.get_bind().dialect.name
+    if dialect_name not in run_key_sql:
+        return
+    if dialect_name == 'postgresql':
+        op.execute("CREATE OR REPLACE FUNCTION log_table_run_key() RETURNS trigger AS $$ "
+                   "BEGIN NEW.run_key := {0}; RETURN NEW; END $$ LANGUAGE plpgsql".format(
+                       run_key_sql['postgresql'].format('NEW.run_id')))
+    for table_name in log_tables:
+        if dialect_name == 'postgresql':
+            op.execute("CREATE TRIGGER {0}_run_key BEFORE INSERT OR UPDATE OF run_id ON {0} "
+                       "FOR EACH ROW EXECUTE PROCEDURE log_table_run_key()".format(table_name))
+        else:
+            update = "UPDATE {0} SET run_key = {1} WHERE rowid = NEW.rowid".format(
+                table_name, run_key_sql['sqlite'].format('NEW.run_id'))
+            op.execute("CREATE TRIGGER {0}_run_key_insert AFTER INSERT ON {0} BEGIN {1}; END".format(table_name,
+                                                                                                    update))
+            op.execute("CREATE TRIGGER {0}_run_key_update AFTER UPDATE OF run_id ON {0} BEGIN {1}; END".format(
+                table_name, update))
+        op.execute("UPDATE {0} SET run_key = {1}".format(table_name, run_key_sql[dialect_name].format('run_id')))
+
+
+def downgrade():
+    dialect_name = op.get_bind().dialect.name
+    for table_name in log_tables:
+        if dialect_name == 'postgresql':
+            op.execute("DROP TRIGGER IF EXISTS {0}_run_key ON {0}".format(table_name))
+        elif dialect_name == 'sqlite':
+            op.execute("DROP TRIGGER IF EXISTS {0}_run_key_insert".format(table_name))
+            op.execute("DROP TRIGGER IF EXISTS {0}_run_key_update".format(table_name))
+    if dialect_name == 'postgresql':
+        op.execute("DROP FUNCTION IF EXISTS log_table_run_key()")
@@ -0,0 +1,28 @@
+"""
+Widen hdfs_disk_usage quota columns and index create_dt for snapshot loads
+
+Revision ID: f3c9a7e1b254
+Revises: e5b1d7f3a820
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f3c9a7e1b254'
+down_revision = 'e5b1d7f3a820'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('hdfs_disk_usage') as batch_op:
+        batch_op.alter_column('quota', type_=sa.String(50), existing_type=sa.String(10))
+        batch_op.alter_column('space_quota', type_=sa.String(50), existing_type=sa.String(10))
+    op.create_index('ix_hdfs_disk_usage_create_dt', 'hdfs_disk_usage', ['create_dt'])
+
+
+def downgrade():
+    op.drop_index('ix_hdfs_disk_usage_create_dt', table_name='hdfs_disk_usage')
+    with op.batch_alter_table('hdfs_disk_usage') as batch_op:
+        batch_op.alter_column('quota', type_=sa.String(10), existing_type=sa.String(50))
+        batch_op.alter_column('space_quota', type_=sa.String(10), existing_type=sa.String(50))
@@ -7,26 +7,58 @@ Version History:
 0.2.1 jwd3 02/27/2017
     Updated path to password module
     Removed defaults for base_dir and mdrepo_db_host
+0.3 agent 10/18/2026
+    Database url and credentials are now resolved on first use instead of at import
+    Added MDREPO_DB_URL environment variable to override the default postgres url
+    Exposed configure and get_engine from repository.connection
+0.3.1 agent 10/18/2026
+    Exposed get_pool_status from repository.connection
+0.3.2 agent 10/18/2026
+    Exposed unit_of_work and get_sessionmaker from repository.connection
+0.3.3 agent 10/18/2026
+    METADATA_DATABASE_URL is available again as a deprecated alias of get_database_url() resolved on access
+    (Python 3.7+)
 """
 import os
+import warnings
 
-from .utils.password import Password
-
-__version__ = "0.2.1"
+__version__ = "0.3.3"
 __date__ = '2016-12-14'
-__updated__ = '02/27/2017'
+__updated__ = '10/18/2026'
+
+db_url = 'postgresql+psycopg2://{user}:{pswd}@{host}:5432/loadmgrdb'
 
 
-base_dir = os.environ.get('MDREPO_DB_PFILE')
-if not base_dir:
-    raise EnvironmentError("Missing environment variable MDREPO_DB_PFILE")
-mdrepo_db_host = os.environ.get('MDREPO_DB_HOST')
-if not mdrepo_db_host:
-    raise EnvironmentError("Missing environment variable MDREPO_DB_HOST")
-mdrepo_db_user = os.environ.get('MDREPO_DB_USER') or 'mdrepo'
-password = Password(host=mdrepo_db_host,username=mdrepo_db_user,data_file_name='.repo',data_file_dir=base_dir)
+def get_database_url():
+    """
+    Build the url for the metadata database from the environment.  MDREPO_DB_URL is used as is when set,
+    otherwise the password is decrypted from the .repo file in MDREPO_DB_PFILE.
+    :return: database url
+    """
+    database_url = os.environ.get('MDREPO_DB_URL')
+    if database_url:
+        return database_url
+    base_dir = os.environ.get('MDREPO_DB_PFILE')
+    if not base_dir:
+        raise EnvironmentError("Missing environment variable MDREPO_DB_PFILE")
+    mdrepo_db_host = os.environ.get('MDREPO_DB_HOST')
+    if not mdrepo_db_host:
+        raise EnvironmentError("Missing environment variable MDREPO_DB_HOST")
+    mdrepo_db_user = os.environ.get('MDREPO_DB_USER') or 'mdrepo'
+    from .utils.password import Password  # deferred so pycrypto is only loaded when needed
+    password = Password(host=mdrepo_db_host,username=mdrepo_db_user,data_file_name='.repo',data_file_dir=base_dir)
+    return db_url.format(user=mdrepo_db_user,
+                         pswd=password.decrypt(),
+                         host=mdrepo_db_host)
 
-db_url = 'postgresql+psycopg2://{user}:{pswd}@{host}:5432/loadmgrdb'
-METADATA_DATABASE_URL = db_url.format(user=mdrepo_db_user,
-                                      pswd=password.decrypt(),
-                                      host=mdrepo_db_host)
+
+def __getattr__(name):
+    # the module level url of 0.2 and earlier, built on first access instead of at import
+    if name == 'METADATA_DATABASE_URL':
+        warnings.warn("repository.METADATA_DATABASE_URL is deprecated - use repository.get_database_url()",
+                      DeprecationWarning, stacklevel=2)
+        return get_database_url()
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+from .connection import configure, get_engine, get_pool_status, get_sessionmaker, unit_of_work  # noqa: E402
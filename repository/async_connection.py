@@ -0,0 +1,117 @@
+"""
+repository/async_connection.py - Library containing asyncio connection objects
+
+Requires Python 3 and an asyncio driver - asyncpg for PostgreSQL or aiosqlite for SQLite.
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+0.1.1 agent 10/18/2026
+    In-memory SQLite uses one StaticPool connection shared by all tasks
+"""
+import os
+import threading
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+
+from repository import connection
+
+__version__ = "0.1.1"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = ['configure_async', 'get_async_engine', 'get_async_sessionmaker']
+
+# sync driver name -> asyncio driver name
+async_drivers = {'postgresql': 'postgresql+asyncpg',
+                 'postgresql+psycopg2': 'postgresql+asyncpg',
+                 'sqlite': 'sqlite+aiosqlite',
+                 'sqlite+pysqlite': 'sqlite+aiosqlite'}
+
+_engine = None
+_engine_pid = None
+_sessionmaker = None
+_settings = {'url': None, 'engine_args': None}
+_lock = threading.Lock()
+
+
+def configure_async(url=None, engine_args=None):
+    """
+    Set the database url and engine arguments used by get_async_engine.  The engine already built is discarded
+    and rebuilt on next use - dispose it with await get_async_engine().dispose() first to close its connections.
+    :param url: SQLAlchemy database url - defaults to the url of repository.get_engine with an asyncio driver
+    :param engine_args: keyword arguments passed to create_async_engine - override the pool strategy defaults
+    :return:
+    """
+    global _engine, _sessionmaker
+    with _lock:
+        _settings['url'] = url
+        _settings['engine_args'] = engine_args
+        _engine = None
+        _sessionmaker = None
+
+
+def get_async_engine():
+    """
+    Return the asyncio engine for the metadata repository, creating it on first use and again in a forked
+    child process
+    :return: sqlalchemy AsyncEngine
+    """
+    global _engine, _engine_pid, _sessionmaker
+    if _engine is None or _engine_pid != os.getpid():
+        with _lock:
+            if _engine is None or _engine_pid != os.getpid():
+                _engine = _create_async_engine()
+                _engine_pid = os.getpid()
+                _sessionmaker = None
+    return _engine
+
+
+def get_async_sessionmaker():
+    """
+    Return the sessionmaker for AsyncSession bound to the current asyncio engine
+    :return: sqlalchemy sessionmaker
+    """
+    global _sessionmaker
+    engine = get_async_engine()
+    if _sessionmaker is None:
+        _sessionmaker = sessionmaker(engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    return _sessionmaker
+
+
+def to_async_url(url):
+    """
+    Replace the driver of a database url with its asyncio driver
+    :param url: database url
+    :return: sqlalchemy URL
+    """
+    url = make_url(url)
+    drivername = async_drivers.get(url.drivername, url.drivername)
+    return url.set(drivername=drivername)
+
+
+def _create_async_engine():
+    url = _settings['url']
+    if url is None:
+        url = _settings_url()
+    url = to_async_url(url)
+    strategy = connection._settings['pool'] or connection._default_pool_strategy(url)
+    if strategy == 'null':
+        args = {'poolclass': NullPool}
+    elif strategy == 'queue':
+        args = connection._pool_args('queue')
+    elif strategy == 'static':
+        args = dict(connection._pool_args('static', url), poolclass=StaticPool)
+    else:
+        args = {}
+    args.update(_settings['engine_args'] or {})
+    return create_async_engine(url, **args)
+
+
+def _settings_url():
+    if connection._settings['url'] is not None:
+        return connection._settings['url']
+    from repository import get_database_url
+    return get_database_url()
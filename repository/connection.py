@@ -8,16 +8,330 @@ Version History:
     Removed dependency on Airflow
 0.3.1 jwd3 02/12/2017
     Removed unused import statements
+0.4 agent 10/18/2026
+    Replaced module level repo_engine with configure and lazy get_engine
+0.5 agent 10/18/2026
+    Added selectable pool strategies (queue, null, static, singleton) sized from the environment
+    Engine pool is disposed and rebuilt in a forked child process
+    Added get_pool_status for checkout, overflow and wait time statistics
+0.6 agent 10/18/2026
+    Added get_sessionmaker to cache one sessionmaker per engine
+    Added unit_of_work to share one session and transaction across operator calls
+0.7 agent 10/18/2026
+    Added get_pool_capacity for sizing thread pools to the connection pool
+0.7.1 agent 10/18/2026
+    In-memory SQLite defaults to one StaticPool connection shared by all threads instead of SingletonThreadPool,
+    which gave every thread its own empty database
+0.7.2 agent 10/18/2026
+    repo_engine is available again as a deprecated alias of get_engine() resolved on access (Python 3.7+)
 """
-from sqlalchemy import create_engine
+import os
+import threading
+import time
+import warnings
 
-from . import METADATA_DATABASE_URL
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, NullPool, StaticPool, SingletonThreadPool
 
-__version__ = "0.3"
+__version__ = "0.7.2"
 __date__ = '2016-10-20'
-__updated__ = '2016-12-15'
+__updated__ = '10/18/2026'
+__all__ = ['configure', 'get_engine', 'get_pool_status', 'get_pool_capacity', 'get_sessionmaker', 'unit_of_work',
+           'UnitOfWork']
 
-engine_args = {'pool_size': 5,
-               'pool_recycle': 3600}
+# name of pool strategy -> pool class
+POOL_STRATEGIES = {'queue': QueuePool,
+                   'null': NullPool,
+                   'static': StaticPool,
+                   'singleton': SingletonThreadPool}
 
-repo_engine = create_engine(METADATA_DATABASE_URL, **engine_args)
+queue_pool_env = {'pool_size': ('MDREPO_DB_POOL_SIZE', 5),
+                  'max_overflow': ('MDREPO_DB_MAX_OVERFLOW', 10),
+                  'pool_timeout': ('MDREPO_DB_POOL_TIMEOUT', 30),
+                  'pool_recycle': ('MDREPO_DB_POOL_RECYCLE', 3600)}
+
+_engine = None
+_engine_pid = None
+_settings = {'url': None, 'engine_args': None, 'pool': None}
+_sessionmakers = {}
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class PoolStatistics(object):
+    """
+    Counters collected from pool events for the current engine
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidated = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def increment(self,name):
+        with self._lock:
+            setattr(self,name,getattr(self,name) + 1)
+
+    def record_wait(self,seconds):
+        with self._lock:
+            self.wait_time += seconds
+            if seconds > self.max_wait_time:
+                self.max_wait_time = seconds
+
+    def as_dict(self):
+        with self._lock:
+            return {'connects': self.connects,
+                    'checkouts': self.checkouts,
+                    'checkins': self.checkins,
+                    'invalidated': self.invalidated,
+                    'wait_time': self.wait_time,
+                    'max_wait_time': self.max_wait_time}
+
+
+statistics = PoolStatistics()
+
+
+class _TimedPoolMixin(object):
+    """
+    Records how long each checkout waited on the pool, including time spent opening a new connection
+    """
+    def _do_get(self):
+        start = time.time()
+        try:
+            return super(_TimedPoolMixin, self)._do_get()
+        finally:
+            statistics.record_wait(time.time() - start)
+
+
+_timed_pool_classes = {}
+
+
+def _timed_pool_class(pool_class):
+    if pool_class not in _timed_pool_classes:
+        _timed_pool_classes[pool_class] = type('Timed' + pool_class.__name__, (_TimedPoolMixin, pool_class), {})
+    return _timed_pool_classes[pool_class]
+
+
+def configure(url=None, engine_args=None, pool=None):
+    """
+    Set the database url, pool strategy and engine arguments used by get_engine.  Any engine already built
+    is disposed and rebuilt on next use.
+    :param url: SQLAlchemy database url - defaults to the url built from the MDREPO_DB_* environment variables
+    :param engine_args: keyword arguments passed to create_engine - override the pool strategy defaults
+    :param pool: queue, null, static or singleton - defaults to MDREPO_DB_POOL or queue
+    :return:
+    """
+    global _engine
+    if pool is not None and pool not in POOL_STRATEGIES:
+        raise ValueError("Unknown pool strategy {0} - expected one of {1}".format(pool, sorted(POOL_STRATEGIES)))
+    with _lock:
+        _settings['url'] = url
+        _settings['engine_args'] = engine_args
+        _settings['pool'] = pool
+        if _engine is not None:
+            _engine.dispose()
+            _engine = None
+        _sessionmakers.clear()
+
+
+def get_engine():
+    """
+    Return the engine for the metadata repository, creating it on first use.  When called in a process
+    forked after the engine was created the inherited pool is discarded without closing the parent's sockets.
+    :return: sqlalchemy engine
+    """
+    global _engine, _engine_pid
+    if _engine is None or _engine_pid != os.getpid():
+        with _lock:
+            if _engine is not None and _engine_pid != os.getpid():
+                _engine.dispose(close=False)
+                _engine_pid = os.getpid()
+            if _engine is None:
+                _engine = _create_engine()
+                _engine_pid = os.getpid()
+    return _engine
+
+
+def __getattr__(name):
+    # the module level engine of 0.3 and earlier, built on first access instead of at import
+    if name == 'repo_engine':
+        warnings.warn("repository.connection.repo_engine is deprecated - use repository.get_engine()",
+                      DeprecationWarning, stacklevel=2)
+        return get_engine()
+    raise AttributeError("module {0!r} has no attribute {1!r}".format(__name__, name))
+
+
+def get_sessionmaker():
+    """
+    Return the sessionmaker bound to the current engine, creating it once per engine
+    :return: sqlalchemy sessionmaker
+    """
+    engine = get_engine()
+    session_factory = _sessionmakers.get(engine)
+    if session_factory is None:
+        # keep attribute values after commit so records can be converted to dictionaries without a reload
+        session_factory = _sessionmakers.setdefault(engine, sessionmaker(autocommit=False, autoflush=False,
+                                                                         expire_on_commit=False, bind=engine))
+    return session_factory
+
+
+class UnitOfWork(object):
+    """
+    One session and one transaction shared by every operator used inside the with block.  The transaction
+    is committed when the block exits normally and rolled back if it raises.  Nested blocks join the
+    outermost unit of work.
+    """
+    def __init__(self):
+        self.session = None
+        self._depth = 0
+
+    def __enter__(self):
+        if self._depth == 0:
+            self.session = get_sessionmaker()()
+            _local.unit_of_work = self
+        self._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._depth -= 1
+        if self._depth > 0:
+            return False
+        try:
+            if exc_type is None:
+                self.session.commit()
+            else:
+                self.session.rollback()
+        finally:
+            self.session.close()
+            self.session = None
+            _local.unit_of_work = None
+        return False
+
+    def commit(self):
+        """Commit the work done so far and start a new transaction on the same session"""
+        self.session.commit()
+
+    def rollback(self):
+        """Roll back the work done so far and start a new transaction on the same session"""
+        self.session.rollback()
+
+
+def unit_of_work():
+    """
+    Return the unit of work active in this thread, or a new one, for use as a context manager::
+
+        with repository.unit_of_work() as uow:
+            stage_log = ImportStageLogOperator().update(source_id=1, run_id=run_id, status='staged')
+            ImportODSLogOperator().update(source_id=1, run_id=run_id, status='loading')
+    :return: UnitOfWork
+    """
+    return get_unit_of_work() or UnitOfWork()
+
+
+def get_unit_of_work():
+    """
+    Return the unit of work active in this thread
+    :return: UnitOfWork or None
+    """
+    return getattr(_local, 'unit_of_work', None)
+
+
+def get_pool_status():
+    """
+    Report the state of the connection pool
+    :return: dictionary of pool strategy, size, checked out and overflow connections and event counters
+    """
+    status = statistics.as_dict()
+    status['strategy'] = None
+    if _engine is not None:
+        pool = _engine.pool
+        status['strategy'] = _settings['pool'] or _default_pool_strategy(_engine.url)
+        status['status'] = pool.status()
+        if isinstance(pool, QueuePool):
+            status['size'] = pool.size()
+            status['checked_out'] = pool.checkedout()
+            status['overflow'] = pool.overflow()
+            status['checked_in'] = pool.checkedin()
+    return status
+
+
+def get_pool_capacity():
+    """
+    Return the maximum number of connections the engine's pool hands out at the same time - 1 for the static
+    pool of an in-memory SQLite database
+    :return: number of connections or None if the pool is not bounded
+    """
+    pool = get_engine().pool
+    if isinstance(pool, QueuePool):
+        max_overflow = pool._max_overflow
+        return pool.size() + max_overflow if max_overflow >= 0 else None
+    if isinstance(pool, StaticPool):
+        return 1
+    return None
+
+
+def _is_memory_sqlite(url):
+    url = make_url(str(url))
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def _default_pool_strategy(url):
+    if str(url).startswith('sqlite'):
+        # an in-memory database exists only inside its connection so every thread must share that connection
+        return 'static' if _is_memory_sqlite(url) else 'null'
+    return os.environ.get('MDREPO_DB_POOL') or 'queue'
+
+
+def _pool_args(strategy, url=None):
+    if strategy == 'queue':
+        return {arg: int(os.environ.get(env_name) or default) for arg, (env_name, default) in queue_pool_env.items()}
+    if strategy == 'static' and url is not None and _is_memory_sqlite(url):
+        # the shared connection is used from the EventWriter, map_select and file cleanup threads
+        return {'connect_args': {'check_same_thread': False}}
+    return {}
+
+
+def _create_engine():
+    url = _settings['url']
+    if url is None:
+        from repository import get_database_url
+        url = get_database_url()
+    strategy = _settings['pool'] or _default_pool_strategy(url)
+    if strategy not in POOL_STRATEGIES:
+        raise ValueError("Unknown pool strategy {0} - expected one of {1}".format(strategy, sorted(POOL_STRATEGIES)))
+    args = _pool_args(strategy, url)
+    args.update(_settings['engine_args'] or {})
+    args.setdefault('poolclass', _timed_pool_class(POOL_STRATEGIES[strategy]))
+    engine = create_engine(url, **args)
+    _add_pool_listeners(engine)
+    return engine
+
+
+def _add_pool_listeners(engine):
+    @event.listens_for(engine, 'connect')
+    def connect(dbapi_connection, connection_record):
+        connection_record.info['pid'] = os.getpid()
+        statistics.increment('connects')
+
+    @event.listens_for(engine, 'checkout')
+    def checkout(dbapi_connection, connection_record, connection_proxy):
+        if connection_record.info.get('pid') != os.getpid():
+            # connection was opened by the parent process - never share its socket
+            connection_record.dbapi_connection = connection_proxy.dbapi_connection = None
+            raise exc.DisconnectionError(
+                "Connection record belongs to pid {0}, attempting to check out in pid {1}".format(
+                    connection_record.info.get('pid'), os.getpid()))
+        statistics.increment('checkouts')
+
+    @event.listens_for(engine, 'checkin')
+    def checkin(dbapi_connection, connection_record):
+        statistics.increment('checkins')
+
+    @event.listens_for(engine, 'invalidate')
+    def invalidate(dbapi_connection, connection_record, exception):
+        statistics.increment('invalidated')
@@ -39,26 +39,105 @@ Version History:
     Changed table name DataWarehouseLog to DataWarehouseDFLog
     Added new table DataWarehouseARLog
     Removed import of Sequence (no longer used)
+0.6 agent 10/18/2026
+    Added numeric run_key column and (parent id, run_key) index to the log tables
+    run_key is kept in sync with run_id by an attribute event
+0.6.1 agent 10/18/2026
+    Added indexes for the file download to stage load anti-join
+0.7 agent 10/18/2026
+    Added claimed_by and lease_expires_dttm to the log tables for work claiming
+0.7.1 agent 10/18/2026
+    Added event_dttm and (event_category, event_group, event_dttm) indexes to Event
+0.7.2 agent 10/18/2026
+    Added created_dttm index to the log tables for retention purges
+0.7.3 agent 10/18/2026
+    Widened HdfsDiskUsage quota and space_quota to hold byte counts and added a create_dt index
+0.7.4 agent 10/18/2026
+    Added numeric name_quota, space_quota_bytes and space_consumed_bytes columns and a (path, create_dt) index
+    to HdfsDiskUsage
+0.8 agent 10/18/2026
+    Added path_depth and parent_path to HdfsDiskUsage with parent and path prefix indexes
+    Added new table HdfsDiskUsageRollup for weekly and monthly usage rollups
+0.8.1 agent 10/18/2026
+    Event.event_dttm is required and defaults to now so the event table can be partitioned on it
+0.8.2 agent 10/18/2026
+    Added length_sum to HdfsDiskUsageRollup so avg_length can be maintained incrementally
+0.8.3 agent 10/18/2026
+    run_key is also set by a trigger on the log tables so rows inserted outside the ORM are indexed
+    to_run_key returns None for run ids outside the BigInteger range
 """
 
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import (Table, Column, Integer, String, BigInteger, DateTime, Date, Boolean,
-                        PickleType, JSON)
+                        PickleType, JSON, Index)
 
 from sqlalchemy.orm import relationship
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, event, DDL
 
+import re
 from datetime import datetime
 
-__version__ = "0.5"
+__version__ = "0.8.3"
 __date__ = '09-22-2016'
-__updated__ = '02-06-2017'
+__updated__ = '10-18-2026'
 __all__ = []
 
 
 ModelBase = declarative_base()
 
 
+max_run_key = 9223372036854775807  # largest BigInteger
+numeric_run_id = re.compile(r'^[0-9]{1,19}\Z')
+
+# run_key of a run_id expression in SQL, matching to_run_key - used by the log table triggers
+run_key_sql = {'postgresql': "CASE WHEN btrim({0}) ~ '^[0-9]{{1,19}}$' AND (length(btrim({0})) < 19 OR "
+                             "btrim({0}) COLLATE \"C\" <= '9223372036854775807') THEN CAST(btrim({0}) AS BIGINT) END",
+               'sqlite': "CASE WHEN trim({0}) <> '' AND trim({0}) NOT GLOB '*[^0-9]*' AND (length(trim({0})) < 19 OR "
+                         "(length(trim({0})) = 19 AND trim({0}) <= '9223372036854775807')) "
+                         "THEN CAST(trim({0}) AS INTEGER) END"}
+
+
+def to_run_key(run_id):
+    """
+    Convert a run id (YYYYMMDDHH24MISS) to the numeric run key used for indexed max/range queries
+    :param run_id: run id string
+    :return: integer or None if the run id is not numeric or does not fit in a BigInteger
+    """
+    if run_id is None:
+        return None
+    run_id = str(run_id).strip()
+    if not numeric_run_id.match(run_id) or int(run_id) > max_run_key:
+        return None
+    return int(run_id)
+
+
+def _set_run_key(target, value, oldvalue, initiator):
+    target.run_key = to_run_key(value)
+
+
+def run_key_trigger_ddl(dialect_name, table_name):
+    """
+    Return the statements creating the trigger which sets run_key from run_id when a log table row is inserted or
+    its run_id is updated, so rows written with raw SQL or by other services are indexed too
+    :param dialect_name: postgresql or sqlite
+    :param table_name: log table
+    :return: list of SQL statements
+    """
+    if dialect_name == 'postgresql':
+        return ["CREATE OR REPLACE FUNCTION log_table_run_key() RETURNS trigger AS $$ "
+                "BEGIN NEW.run_key := {0}; RETURN NEW; END $$ LANGUAGE plpgsql".format(
+                    run_key_sql['postgresql'].format('NEW.run_id')),
+                "CREATE TRIGGER {0}_run_key BEFORE INSERT OR UPDATE OF run_id ON {0} "
+                "FOR EACH ROW EXECUTE PROCEDURE log_table_run_key()".format(table_name)]
+    if dialect_name == 'sqlite':
+        update = "UPDATE {0} SET run_key = {1} WHERE rowid = NEW.rowid".format(
+            table_name, run_key_sql['sqlite'].format('NEW.run_id'))
+        return ["CREATE TRIGGER {0}_run_key_insert AFTER INSERT ON {0} BEGIN {1}; END".format(table_name, update),
+                "CREATE TRIGGER {0}_run_key_update AFTER UPDATE OF run_id ON {0} BEGIN {1}; END".format(table_name,
+                                                                                                      update)]
+    return []
+
+
 class FileCleanup(ModelBase):
     __tablename__ = 'file_cleanup'
 
@@ -134,6 +213,8 @@ class ImportDefinition(ModelBase):
 
 class ImportODSLog(ModelBase):
     __tablename__ = 'import_ods_log'
+    __table_args__ = (Index('ix_import_ods_log_source_id_run_key', 'source_id', 'run_key'),
+                      Index('ix_import_ods_log_created_dttm', 'created_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
@@ -141,6 +222,9 @@ class ImportODSLog(ModelBase):
     etag = Column(String(256))
     source_id = Column(Integer, ForeignKey("import_definition.id"))
     run_id = Column(String(50))
+    run_key = Column(BigInteger)  # numeric run_id set by _set_run_key and the run_key trigger
+    claimed_by = Column(String(100))  # worker holding the lease on the record
+    lease_expires_dttm = Column(DateTime)  # claim can be taken over by another worker after this time
     status = Column(String(20))  # loading, operational
     table_name = Column(String(500))
     loaded_dttm = Column(DateTime)
@@ -157,6 +241,11 @@ ImportDefinition.ods_loads = relationship("ImportODSLog", back_populates="source
 
 class ImportStageLog(ModelBase):
     __tablename__ = 'import_stage_log'
+    __table_args__ = (Index('ix_import_stage_log_source_id_run_key', 'source_id', 'run_key'),
+                      Index('ix_import_stage_log_source_id_run_id_name',
+                            'source_id', 'run_id', 'realized_source_name'),
+                      Index('ix_import_stage_log_status_id', 'status', 'id'),
+                      Index('ix_import_stage_log_created_dttm', 'created_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
@@ -164,6 +253,9 @@ class ImportStageLog(ModelBase):
     etag = Column(String(256))
     source_id = Column(Integer, ForeignKey("import_definition.id"))
     run_id = Column(String(50))  # run value from Airflow
+    run_key = Column(BigInteger)  # numeric run_id set by _set_run_key and the run_key trigger
+    claimed_by = Column(String(100))  # worker holding the lease on the record
+    lease_expires_dttm = Column(DateTime)  # claim can be taken over by another worker after this time
     status = Column(String(20))  # downloading, preprocessed, validated, staged, promoted, deleted
     realized_source_name = Column(String(500))  # can be full path and filename
     loaded_dttm = Column(DateTime)
@@ -183,6 +275,10 @@ ImportDefinition.stage_loads = relationship("ImportStageLog", back_populates="so
 
 class ImportFileDownloadLog(ModelBase):
     __tablename__ = 'import_file_download_log'
+    __table_args__ = (Index('ix_import_file_download_log_source_id_run_key', 'source_id', 'run_key'),
+                      Index('ix_import_file_download_log_status_source_id', 'status', 'source_id'),
+                      Index('ix_import_file_download_log_status_id', 'status', 'id'),
+                      Index('ix_import_file_download_log_created_dttm', 'created_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
@@ -190,6 +286,9 @@ class ImportFileDownloadLog(ModelBase):
     etag = Column(String(256))
     source_id = Column(Integer, ForeignKey("import_definition.id"))
     run_id = Column(String(50))  # run value from Airflow
+    run_key = Column(BigInteger)  # numeric run_id set by _set_run_key and the run_key trigger
+    claimed_by = Column(String(100))  # worker holding the lease on the record
+    lease_expires_dttm = Column(DateTime)  # claim can be taken over by another worker after this time
     inbound_path = Column(String(500))
     filename = Column(String(500))
     status = Column(String(20))  # downloading, preprocessed, validated, staged, promoted, deleted
@@ -223,6 +322,8 @@ class DataWarehouseDefinition(ModelBase):
 
 class DataWarehouseDFLog(ModelBase):
     __tablename__ = 'data_warehouse_df_log'
+    __table_args__ = (Index('ix_data_warehouse_df_log_dw_id_run_key', 'dw_id', 'run_key'),
+                      Index('ix_data_warehouse_df_log_created_dttm', 'created_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
@@ -230,6 +331,9 @@ class DataWarehouseDFLog(ModelBase):
     etag = Column(String(256))
     dw_id = Column(Integer, ForeignKey("data_warehouse_definition.id"))
     run_id = Column(String(50))
+    run_key = Column(BigInteger)  # numeric run_id set by _set_run_key and the run_key trigger
+    claimed_by = Column(String(100))  # worker holding the lease on the record
+    lease_expires_dttm = Column(DateTime)  # claim can be taken over by another worker after this time
     status = Column(String(20))  # loading, operational
     table_name = Column(String(500))
     loaded_dttm = Column(DateTime)
@@ -246,6 +350,8 @@ DataWarehouseDefinition.dw_df_load = relationship("DataWarehouseDFLog", back_pop
 
 class DataWarehouseARLog(ModelBase):
     __tablename__ = 'data_warehouse_ar_log'
+    __table_args__ = (Index('ix_data_warehouse_ar_log_dw_id_run_key', 'dw_id', 'run_key'),
+                      Index('ix_data_warehouse_ar_log_created_dttm', 'created_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
@@ -253,6 +359,9 @@ class DataWarehouseARLog(ModelBase):
     etag = Column(String(256))
     dw_id = Column(Integer, ForeignKey("data_warehouse_definition.id"))
     run_id = Column(String(50))
+    run_key = Column(BigInteger)  # numeric run_id set by _set_run_key and the run_key trigger
+    claimed_by = Column(String(100))  # worker holding the lease on the record
+    lease_expires_dttm = Column(DateTime)  # claim can be taken over by another worker after this time
     status = Column(String(20))  # loading, operational
     table_name = Column(String(500))
     loaded_dttm = Column(DateTime)
@@ -288,6 +397,8 @@ class ExportDefinition(ModelBase):
 
 class ExportLog(ModelBase):
     __tablename__ = 'export_log'
+    __table_args__ = (Index('ix_export_log_export_id_run_key', 'export_id', 'run_key'),
+                      Index('ix_export_log_created_dttm', 'created_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
@@ -295,6 +406,9 @@ class ExportLog(ModelBase):
     etag = Column(String(256))
     export_id = Column(Integer, ForeignKey("export_definition.id"))
     run_id = Column(String(50))
+    run_key = Column(BigInteger)  # numeric run_id set by _set_run_key and the run_key trigger
+    claimed_by = Column(String(100))  # worker holding the lease on the record
+    lease_expires_dttm = Column(DateTime)  # claim can be taken over by another worker after this time
     status = Column(String(20))  # extracting, prepared
     export_target_name = Column(String(500))  # file_name, table_name, queue_name, etc.
     export_location = Column(String(500))  # file system, database, host, etc.
@@ -310,14 +424,24 @@ class ExportLog(ModelBase):
 ExportDefinition.export_run = relationship("ExportLog", back_populates="data_export")
 
 
+for log_table_class in (ImportODSLog, ImportStageLog, ImportFileDownloadLog, DataWarehouseDFLog, DataWarehouseARLog,
+                        ExportLog):
+    event.listen(log_table_class.run_id, 'set', _set_run_key)
+    for dialect_name in ('postgresql', 'sqlite'):
+        for statement in run_key_trigger_ddl(dialect_name, log_table_class.__tablename__):
+            event.listen(log_table_class.__table__, 'after_create', DDL(statement).execute_if(dialect=dialect_name))
+
+
 class Event(ModelBase):
     __tablename__ = 'event'
+    __table_args__ = (Index('ix_event_event_dttm', 'event_dttm'),
+                      Index('ix_event_category_group_dttm', 'event_category', 'event_group', 'event_dttm'))
 
     id = Column(Integer, primary_key=True)
     created_dttm = Column(DateTime, default=datetime.now)
     modified_dttm = Column(DateTime, default=datetime.now, onupdate=datetime.now)
     etag = Column(String(256))
-    event_dttm = Column(DateTime)
+    event_dttm = Column(DateTime, nullable=False, default=datetime.now)
     event_category = Column(String(30))
     event_group = Column(String(100))
     event_type = Column(String(100))
@@ -345,6 +469,11 @@ class ValidValue(ModelBase):
 
 class HdfsDiskUsage(ModelBase):
     __tablename__ = 'hdfs_disk_usage'
+    __table_args__ = (Index('ix_hdfs_disk_usage_create_dt', 'create_dt'),
+                      Index('ix_hdfs_disk_usage_path_create_dt', 'path', 'create_dt'),
+                      Index('ix_hdfs_disk_usage_parent_path_create_dt', 'parent_path', 'create_dt'),
+                      # serves path LIKE 'prefix%' on postgres whatever the database collation
+                      Index('ix_hdfs_disk_usage_path_prefix', 'path', postgresql_ops={'path': 'varchar_pattern_ops'}))
 
     id = Column(Integer, primary_key=True)
     create_dt = Column(Date)
@@ -352,9 +481,41 @@ class HdfsDiskUsage(ModelBase):
     directory_count = Column(Integer)
     file_count = Column(Integer)
     length = Column(BigInteger)
-    quota = Column(String(10))
-    space_quota = Column(String(10))
+    quota = Column(String(50))
+    space_quota = Column(String(50))
     space_consumed = Column(String(50))
+    name_quota = Column(BigInteger)  # numeric quota, space_quota and space_consumed - null when unlimited
+    space_quota_bytes = Column(BigInteger)
+    space_consumed_bytes = Column(BigInteger)
+    path_depth = Column(Integer)  # number of directories in path - / is 0
+    parent_path = Column(String(300))
 
     def __repr__(self):
         return self.path
+
+
+class HdfsDiskUsageRollup(ModelBase):
+    __tablename__ = 'hdfs_disk_usage_rollup'
+    __table_args__ = (Index('ix_hdfs_disk_usage_rollup_period_path', 'period', 'path', 'period_start_dt', unique=True),
+                      Index('ix_hdfs_disk_usage_rollup_period_parent_path', 'period', 'parent_path',
+                            'period_start_dt'))
+
+    id = Column(Integer, primary_key=True)
+    created_dttm = Column(DateTime, default=datetime.now)
+    period = Column(String(10))  # week or month
+    period_start_dt = Column(Date)
+    path = Column(String(300))
+    path_depth = Column(Integer)
+    parent_path = Column(String(300))
+    snapshot_count = Column(Integer)
+    last_dt = Column(Date)  # the latest snapshot in the period - counts and sizes are taken from it
+    directory_count = Column(Integer)
+    file_count = Column(Integer)
+    length = Column(BigInteger)
+    space_consumed_bytes = Column(BigInteger)
+    max_length = Column(BigInteger)
+    length_sum = Column(BigInteger)  # sum of length over the snapshots - avg_length is length_sum / snapshot_count
+    avg_length = Column(BigInteger)
+
+    def __repr__(self):
+        return "{0} {1} {2}".format(self.period,self.period_start_dt,self.path)
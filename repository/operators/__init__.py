@@ -2,29 +2,40 @@
 repository/operators/__init__.py - Initialize repository.operators package
 
 Version History:
-
+0.2 agent 10/18/2026
+    Added ValidValueOperator
+0.3 agent 10/18/2026
+    Added EventOperator and EventWriter
+0.4 agent 10/18/2026
+    Added HdfsDiskUsageRollupOperator
 """
 from .workflow_operators import WorkflowConfigOperator
 from .dw_operators import DataWarehouseDefinitionOperator, DataWarehouseDFLogOperator, DataWarehouseARLogOperator
 from .export_operators import ExportDefinitionOperator, ExportLogOperator
 from .file_cleanup_operator import FileCleanupOperator
-from .hdfs_usage_operator import HdfsDiskUsageOperator
+from .hdfs_usage_operator import HdfsDiskUsageOperator, HdfsDiskUsageRollupOperator
+from .event_operators import EventOperator, EventWriter
+from .valid_value_operator import ValidValueOperator
 from .import_operators import (ImportDefinitionOperator, ImportODSLogOperator, ImportFileDownloadLogOperator,
                                ImportStageLogOperator)
 
-__version__ = "0.1"
+__version__ = "0.4"
 __date__ = '02/28/2017'
-__updated__ = '02/28/2017'
+__updated__ = '10/18/2026'
 __all__ = ['ImportDefinitionOperator',
            'ImportFileDownloadLogOperator',
            'ImportStageLogOperator',
            'ImportODSLogOperator',
            'HdfsDiskUsageOperator',
+           'HdfsDiskUsageRollupOperator',
            'FileCleanupOperator',
            'WorkflowConfigOperator',
            'DataWarehouseDefinitionOperator',
            'DataWarehouseDFLogOperator',
            'DataWarehouseARLogOperator',
            'ExportDefinitionOperator',
-           'ExportLogOperator'
+           'ExportLogOperator',
+           'ValidValueOperator',
+           'EventOperator',
+           'EventWriter'
            ]
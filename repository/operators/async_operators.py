@@ -0,0 +1,164 @@
+"""
+repository.operators.async_operators - asyncio versions of the base operators
+
+Requires Python 3 and an asyncio driver (see repository.async_connection).  The operators hold no per call state
+so one instance can be shared by any number of concurrent tasks.
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+"""
+from sqlalchemy import func, select
+
+from repository.async_connection import get_async_sessionmaker
+from repository.metadata.models import (ImportDefinition, ImportFileDownloadLog, ImportStageLog, ImportODSLog,
+                                        DataWarehouseDefinition, DataWarehouseDFLog, DataWarehouseARLog,
+                                        ExportDefinition, ExportLog, WorkflowConfig, Event)
+from repository.operators.base_operator import BaseOperator
+
+__version__ = "0.1"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = ['AsyncBaseOperator', 'AsyncLogTableOperator', 'AsyncImportDefinitionOperator',
+           'AsyncImportFileDownloadLogOperator', 'AsyncImportStageLogOperator', 'AsyncImportODSLogOperator',
+           'AsyncDataWarehouseDefinitionOperator', 'AsyncDataWarehouseDFLogOperator',
+           'AsyncDataWarehouseARLogOperator', 'AsyncExportDefinitionOperator', 'AsyncExportLogOperator',
+           'AsyncWorkflowConfigOperator', 'AsyncEventOperator']
+
+
+class AsyncBaseOperator(object):
+    """
+    Defines coroutines for database operations for a table
+    """
+    db_table_class = None  # Set in sub-classes
+
+    # query building is shared with the blocking operators
+    filter_clauses = BaseOperator.filter_clauses
+    order_clauses = BaseOperator.order_clauses
+    _core_select = BaseOperator._core_select
+    convert_to_dict = staticmethod(BaseOperator.convert_to_dict)
+
+    async def update(self,**kwargs):
+        """
+        Update existing record if pk value is included else create a new record and return pk value
+        :param kwargs: columns and values to be updated
+        :return: dictionary version of updated or inserted record
+        """
+        async with get_async_sessionmaker()() as session:
+            record = None
+            if 'id' in kwargs:
+                record = await session.get(self.db_table_class, kwargs['id'])
+            if record is None:
+                record = self.db_table_class(**({'id': kwargs['id']} if 'id' in kwargs else {}))
+                session.add(record)
+            for column,value in kwargs.items():
+                if column not in ['id'] and hasattr(record,column):
+                    setattr(record,column,value)
+            await session.commit()
+            return self.convert_to_dict(record)
+
+    async def _select(self,return_type='all',**kwargs):
+        """
+        Generic select method - see BaseOperator.select_rows for the arguments
+        :param return_type: all, one or first
+        :return: dictionary or list of dictionary for each record
+        """
+        query = self._core_select(**kwargs)
+        if return_type == 'first':
+            query = query.limit(1)
+        async with get_async_sessionmaker()() as session:
+            result = await session.execute(query)
+            if return_type == 'one':
+                row = result.one_or_none()
+            elif return_type == 'first':
+                row = result.first()
+            else:
+                return [dict(row._mapping) for row in result]
+        return dict(row._mapping) if row is not None else None
+
+    async def select(self,**kwargs):
+        return await self._select(return_type='all',**kwargs)
+
+    async def select_one(self,**kwargs):
+        return await self._select(return_type='one',**kwargs)
+
+    async def select_first(self,**kwargs):
+        return await self._select(return_type='first',**kwargs)
+
+
+class AsyncLogTableOperator(AsyncBaseOperator):
+    """
+    Defines coroutines for database tables used to log run information
+    """
+    source_column = 'source_id'  # column with the id of the definition the log records belong to
+
+    async def set_status(self,pk,status):
+        """
+        Special method for setting only the status of an existing record
+        :param pk:
+        :param status:
+        :return:
+        """
+        await self.update(id=pk,status=status)
+
+    async def get_max_run_id(self,source_id,date_filter=None):
+        """
+        Return the max run id for a particular source, but not greater than date_filter if provided.
+        :param source_id: id value for the source
+        :param date_filter: date cap in the format YYYYMMDDHH24MISS
+        :return: run id or None if the source has no runs
+        """
+        table = self.db_table_class.__table__
+        query = select(func.max(table.c.run_key)).where(table.c[self.source_column] == source_id)
+        if date_filter:
+            query = query.where(table.c.run_key <= int(date_filter))
+        async with get_async_sessionmaker()() as session:
+            result = (await session.execute(query)).scalar()
+        return int(result) if result is not None else None
+
+
+class AsyncImportDefinitionOperator(AsyncBaseOperator):
+    db_table_class = ImportDefinition
+
+
+class AsyncImportFileDownloadLogOperator(AsyncLogTableOperator):
+    db_table_class = ImportFileDownloadLog
+
+
+class AsyncImportStageLogOperator(AsyncLogTableOperator):
+    db_table_class = ImportStageLog
+
+
+class AsyncImportODSLogOperator(AsyncLogTableOperator):
+    db_table_class = ImportODSLog
+
+
+class AsyncDataWarehouseDefinitionOperator(AsyncBaseOperator):
+    db_table_class = DataWarehouseDefinition
+
+
+class AsyncDataWarehouseDFLogOperator(AsyncLogTableOperator):
+    db_table_class = DataWarehouseDFLog
+    source_column = 'dw_id'
+
+
+class AsyncDataWarehouseARLogOperator(AsyncLogTableOperator):
+    db_table_class = DataWarehouseARLog
+    source_column = 'dw_id'
+
+
+class AsyncExportDefinitionOperator(AsyncBaseOperator):
+    db_table_class = ExportDefinition
+
+
+class AsyncExportLogOperator(AsyncLogTableOperator):
+    db_table_class = ExportLog
+    source_column = 'export_id'
+
+
+class AsyncWorkflowConfigOperator(AsyncBaseOperator):
+    db_table_class = WorkflowConfig
+
+
+class AsyncEventOperator(AsyncBaseOperator):
+    db_table_class = Event
@@ -9,49 +9,212 @@ Version History:
     Created staticmethod convert_to_dict
     Renamed StatusTableOperator to LogTableOperator
     Added new method get_max_run_id to LogTableOperator
+0.3 agent 10/18/2026
+    Sessions are bound to the lazily created engine from repository.connection.get_engine
+0.4 agent 10/18/2026
+    Sessions come from the cached sessionmaker and join the active unit of work when there is one
+    Added commit so operators flush instead of committing inside a unit of work
+0.5 agent 10/18/2026
+    Added bulk_update for chunked INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite
+0.6 agent 10/18/2026
+    Added select_rows to build dictionaries straight from a Core select without loading ORM instances
+0.7 agent 10/18/2026
+    Added select_iter to stream records through a server side cursor
+0.8 agent 10/18/2026
+    Added LogTableOperator.page for keyset pagination with an opaque cursor
+0.9 agent 10/18/2026
+    Added filter lookups (column__in, column__gte, column__like, ...), order_by and limit to the select methods
+    Added count and exists
+0.10 agent 10/18/2026
+    Added DefinitionTableOperator with an opt-in read through cache revalidated against modified_dttm/etag
+0.11 agent 10/18/2026
+    get_max_run_id uses the indexed run_key column instead of casting run_id
+    Added get_max_run_ids for many sources in one GROUP BY query
+    Added LogTableOperator.source_column for log tables keyed by dw_id or export_id
+0.12 agent 10/18/2026
+    Added set_status_many to change the status of many records with one UPDATE ... RETURNING
+0.13 agent 10/18/2026
+    Added claim and release for workers sharing a log table as a work queue (FOR UPDATE SKIP LOCKED)
+0.14 agent 10/18/2026
+    session, record and shared_session are thread local so an operator instance can be shared by threads
+    Added map_select and map_update to run many independent calls on a thread pool sized to the connection pool
+0.15 agent 10/18/2026
+    Added LogTableOperator.purge to delete or archive old log records in chunks
+0.15.1 agent 10/18/2026
+    get_session checks for the active unit of work on every call instead of reusing a session left by an
+    earlier call, and a call which raises discards its session
+0.15.2 agent 10/18/2026
+    The cache revalidates select_first against the first matching record only, not every matching record
+0.15.3 agent 10/18/2026
+    get_archive_table reflects an existing archive table and purge archives only the columns both tables have,
+    so purge keeps working after a column is added to the log table
+0.15.4 agent 10/18/2026
+    exists selects from the table so it works without filters
+0.15.5 agent 10/18/2026
+    bulk_update sends one row per conflict key in each statement, the last record for the key winning
+    bulk_update on other databases updates the record with the same conflict key values instead of inserting
+0.15.6 agent 10/18/2026
+    page raises ValueError for a limit below 1 instead of returning a cursor for an empty page
 """
-from sqlalchemy import func, cast, BigInteger
+import base64
+import copy
+import functools
+import operator
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import (func, select, update, delete, insert, and_, or_, exists as exists_clause, inspect, Table,
+                        Column, MetaData)
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm.exc import NoResultFound
-from sqlalchemy.orm import sessionmaker, scoped_session
-from repository.connection import repo_engine
-from collections import Iterable
+from repository.connection import get_engine, get_sessionmaker, get_unit_of_work, get_pool_capacity
+from repository.metadata.models import to_run_key
+from repository.utils.cache import RecordCache
+try:
+    from collections.abc import Iterable
+except ImportError:
+    from collections import Iterable
 
-__version__ = "0.2"
+__version__ = "0.15.6"
 __date__ = '01/11/2017'
-__updated__ = '02/06/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
+# lookups used as column__lookup=value in the select methods, i.e. status__in=['staged', 'promoted']
+FILTER_LOOKUPS = {'eq': operator.eq,
+                  'ne': operator.ne,
+                  'lt': operator.lt,
+                  'lte': operator.le,
+                  'gt': operator.gt,
+                  'gte': operator.ge,
+                  'in': lambda column, value: column.in_(value),
+                  'notin': lambda column, value: column.notin_(value),
+                  'between': lambda column, value: column.between(*value),
+                  'like': lambda column, value: column.like(value),
+                  'ilike': lambda column, value: column.ilike(value),
+                  'startswith': lambda column, value: column.startswith(value, autoescape=True),
+                  'isnull': lambda column, value: column.is_(None) if value else column.isnot(None)}
+
+
+def session_method(method):
+    """
+    Decorate an operator method which opens a session so the session is discarded when the method raises and
+    the next call does not reuse it
+    """
+    @functools.wraps(method)
+    def wrapper(self,*args,**kwargs):
+        try:
+            return method(self,*args,**kwargs)
+        except Exception:
+            self.discard_session()
+            raise
+    return wrapper
+
 
 class BaseOperator(object):
     """
     Defines methods and attributes for database operations for a table
     """
     db_table_class = None  # Set in sub-classes
+    bulk_chunk_size = 1000  # number of records sent in each bulk_update statement
+    upsert_dialects = ('postgresql', 'sqlite')  # databases bulk_update sends INSERT ... ON CONFLICT to
+    default_map_workers = 8  # threads used by map_select and map_update when the pool is not bounded
 
     def __init__(self):
-        self.session = None
-        self.record = None
+        # per call state is kept per thread so one operator instance can be shared by threads
+        self._local = threading.local()
 
     def __del__(self):
-        self.close_session()
+        if '_local' in self.__dict__:
+            self.close_session()
+
+    @property
+    def session(self):
+        return getattr(self._local, 'session', None)
+
+    @session.setter
+    def session(self,session):
+        self._local.session = session
+
+    @property
+    def record(self):
+        return getattr(self._local, 'record', None)
+
+    @record.setter
+    def record(self,record):
+        self._local.record = record
+
+    @property
+    def shared_session(self):
+        return getattr(self._local, 'shared_session', False)
+
+    @shared_session.setter
+    def shared_session(self,shared_session):
+        self._local.shared_session = shared_session
 
     def get_session(self):
-        session = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=repo_engine))
-        self.session = session()
+        """
+        Set the session for a call - the session of the unit of work active in this thread, otherwise the
+        operator's own session.  A session which no longer matches the active unit of work is discarded.
+        :return:
+        """
+        unit_of_work = get_unit_of_work()
+        if self.session is not None:
+            if unit_of_work is not None and self.session is unit_of_work.session:
+                return
+            if unit_of_work is None and not self.shared_session:
+                return
+            self.discard_session()
+        if unit_of_work is not None:
+            self.session = unit_of_work.session
+            self.shared_session = True
+        else:
+            self.session = get_sessionmaker()()
+            self.shared_session = False
 
     def close_session(self):
         if self.session:
-            self.session.expunge_all()
-            self.session.close()
+            # a session shared with a unit of work is closed when the unit of work ends
+            if not self.shared_session:
+                self.session.expunge_all()
+                self.session.close()
+            self.session = None
+        self.shared_session = False
 
+    def discard_session(self):
+        """
+        Forget the session of a failed call, rolling back and closing it unless it belongs to a unit of work
+        :return:
+        """
+        session, shared_session = self.session, self.shared_session
+        self.session = None
+        self.shared_session = False
+        if session is not None and not shared_session:
+            try:
+                session.rollback()
+            finally:
+                session.close()
+
+    def commit(self):
+        """
+        Commit the session, or only flush it when the commit belongs to an active unit of work
+        :return:
+        """
+        if self.shared_session:
+            self.session.flush()
+        else:
+            self.session.commit()
+
+    @session_method
     def update(self,**kwargs):
         """
         Update existing record if pk value is included else create a new record and return pk value
         :param kwargs: columns and values to be updated
         :return: dictionary version of updated or inserted record
         """
-        if not self.session:
-            self.get_session()
+        self.get_session()
         if 'id' in kwargs:
             try:
                 # first try to update
@@ -65,11 +228,158 @@ class BaseOperator(object):
             if column not in ['id'] and hasattr(self.record,column):
                 setattr(self.record,column,value)
         self.session.add(self.record)  # todo: not necessary for updates
-        self.session.commit()
+        self.commit()
         record_dict = self.convert_to_dict(self.record)
         self.close_session()
         return record_dict
 
+    @session_method
+    def bulk_update(self,records,conflict_keys=('id',),chunk_size=None):
+        """
+        Insert records or update the existing record with the same conflict key values, sending each chunk of
+        records as one INSERT ... ON CONFLICT DO UPDATE statement and committing once at the end.  Only the
+        columns present in a record are updated.  When several records have the same conflict key values the
+        last one wins and all of them get the resulting record.  Databases other than PostgreSQL and SQLite look
+        up each record by its conflict keys and fall back to update.
+        :param records: iterable of dictionaries of columns and values
+        :param conflict_keys: columns with a primary key or unique constraint used to find existing records
+        :param chunk_size: number of records per statement - defaults to bulk_chunk_size
+        :return: list of dictionary versions of the updated or inserted records in the order given
+        """
+        self.get_session()
+        dialect_name = self.session.get_bind().dialect.name
+        if dialect_name not in self.upsert_dialects:
+            self.close_session()
+            return [self._update_by_keys(record, conflict_keys) for record in records]
+        table = self.db_table_class.__table__
+        chunk_size = chunk_size or self.bulk_chunk_size
+        # a multi-row VALUES clause needs the same columns in every row so group records by their columns
+        record_groups = {}
+        for position, record in enumerate(records):
+            values = dict((column, value) for column, value in record.items() if column in table.c)
+            record_groups.setdefault(tuple(sorted(values)), []).append((position, values))
+        result_list = []
+        for columns, group in record_groups.items():
+            if all(key in columns for key in conflict_keys):
+                group = self._unique_by_keys(group, conflict_keys)
+            else:
+                group = [([position], values) for position, values in group]
+            for start in range(0, len(group), chunk_size):
+                chunk = group[start:start + chunk_size]
+                rows = self._upsert(dialect_name, table, columns, conflict_keys, [values for _, values in chunk])
+                for (positions, _), row in zip(chunk, rows):
+                    result_list.extend((position, row) for position in positions)
+        self.commit()
+        self.close_session()
+        return [row for _, row in sorted(result_list, key=lambda item: item[0])]
+
+    @staticmethod
+    def _unique_by_keys(group,conflict_keys):
+        """
+        Merge the records of a group having the same conflict key values - an ON CONFLICT DO UPDATE statement can
+        not affect a row twice on PostgreSQL
+        :return: list of tuples of the positions of the merged records and the values of the last one
+        """
+        merged = {}
+        keys = []
+        for position, values in group:
+            key = tuple(values[column] for column in conflict_keys)
+            if key not in merged:
+                keys.append(key)
+            positions = merged[key][0] if key in merged else []
+            positions.append(position)
+            merged[key] = (positions, values)
+        return [merged[key] for key in keys]
+
+    def _update_by_keys(self,record,conflict_keys):
+        """
+        Update the record with the same conflict key values as a record, or insert it when there is none
+        """
+        if 'id' not in record and all(key in record for key in conflict_keys):
+            existing = self.select_rows(['id'], limit=1, **dict((key, record[key]) for key in conflict_keys))
+            if existing:
+                record = dict(record, id=existing[0]['id'])
+        return self.update(**record)
+
+    def _upsert(self,dialect_name,table,columns,conflict_keys,values_list):
+        """
+        Execute one INSERT ... ON CONFLICT DO UPDATE statement for records having the same columns
+        :return: list of dictionaries for the affected rows in the order of values_list
+        """
+        insert = postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+        statement = insert(table).values(values_list)
+        has_conflict_keys = all(key in columns for key in conflict_keys)
+        if has_conflict_keys:
+            set_columns = dict((column, statement.excluded[column])
+                               for column in columns if column not in conflict_keys)
+            for column in table.c:
+                # the insert default of an onupdate column (i.e. modified_dttm) is the value for the update
+                if column.onupdate is not None and column.name not in set_columns:
+                    set_columns[column.name] = statement.excluded[column.name]
+            statement = statement.on_conflict_do_update(index_elements=list(conflict_keys), set_=set_columns)
+        if dialect_name == 'postgresql':
+            result = self.session.execute(statement.returning(*table.c))
+            return [dict(row._mapping) for row in result]
+        # SQLAlchemy does not support RETURNING on SQLite so select the affected rows by their keys
+        if not has_conflict_keys:
+            # new records without key values - insert one at a time to learn the generated primary keys
+            conflict_keys = [column.name for column in table.primary_key]
+            values_list = [dict(zip(conflict_keys, self.session.execute(insert(table).values(values))
+                                    .inserted_primary_key)) for values in values_list]
+        else:
+            self.session.execute(statement)
+        key_filters = [and_(*[table.c[key] == values[key] for key in conflict_keys]) for values in values_list]
+        rows = dict((tuple(row._mapping[key] for key in conflict_keys), dict(row._mapping))
+                    for row in self.session.execute(select(table).where(or_(*key_filters))))
+        return [rows[tuple(values[key] for key in conflict_keys)] for values in values_list]
+
+    def filter_clauses(self,filters):
+        """
+        Build the where clauses for a dictionary of filters.  Keys are a column name for equality or a column
+        name and lookup separated by a double underscore, i.e. created_dttm__gte=start or status__in=[...]
+        :param filters: dictionary of filters
+        :return: list of sqlalchemy clauses
+        """
+        clauses = []
+        for name, value in filters.items():
+            column_name, _, lookup = name.partition('__')
+            lookup = lookup or 'eq'
+            if lookup not in FILTER_LOOKUPS:
+                raise ValueError("Unknown filter lookup {0} - expected one of {1}".format(lookup,
+                                                                                       sorted(FILTER_LOOKUPS)))
+            column = getattr(self.db_table_class, column_name, None)
+            if column is None:
+                raise ValueError("{0} has no column {1}".format(self.db_table_class.__name__, column_name))
+            clauses.append(FILTER_LOOKUPS[lookup](column, value))
+        return clauses
+
+    def order_clauses(self,order_by):
+        """
+        Build the order by clauses for a column name or list of column names - prefix a name with - for descending
+        :param order_by: column name or list of column names
+        :return: list of sqlalchemy clauses
+        """
+        if not order_by:
+            return []
+        if not isinstance(order_by, (list, tuple)):
+            order_by = [order_by]
+        clauses = []
+        for column_name in order_by:
+            column = getattr(self.db_table_class, column_name.lstrip('-'))
+            clauses.append(column.desc() if column_name.startswith('-') else column.asc())
+        return clauses
+
+    def _core_select(self,columns=None,order_by=None,limit=None,**kwargs):
+        """
+        Build a Core select on the table for the select_rows family of methods
+        """
+        table = self.db_table_class.__table__
+        query = select(*[table.c[column] for column in columns] if columns else [table])
+        query = query.where(*self.filter_clauses(kwargs)).order_by(*self.order_clauses(order_by))
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
     @staticmethod
     def convert_to_dict(instance):
         """
@@ -81,16 +391,21 @@ class BaseOperator(object):
         record_dict.pop('_sa_instance_state')
         return record_dict
 
-    def _select(self,return_type='all',**kwargs):
+    @session_method
+    def _select(self,return_type='all',order_by=None,limit=None,**kwargs):
         """
         Generic select method
         :param return_type: all, one or first - determines which query operator to use
-        :param kwargs: contains columns and values to use as filter
+        :param order_by: column name or list of column names - prefix a name with - for descending
+        :param limit: maximum number of records
+        :param kwargs: contains columns and values to use as filter - see filter_clauses
         :return: dictionary or list of dictionary for each record
         """
-        if not self.session:
-            self.get_session()
-        query = self.session.query(self.db_table_class).filter_by(**kwargs)
+        self.get_session()
+        query = (self.session.query(self.db_table_class).filter(*self.filter_clauses(kwargs))
+                 .order_by(*self.order_clauses(order_by)))
+        if limit is not None:
+            query = query.limit(limit)
         if return_type == 'one':
             result = query.one_or_none()
         elif return_type == 'first':
@@ -109,6 +424,105 @@ class BaseOperator(object):
     def select(self,**kwargs):
         return self._select(return_type='all',**kwargs)
 
+    @session_method
+    def select_rows(self,columns=None,order_by=None,limit=None,**kwargs):
+        """
+        Select from the table without creating ORM instances
+        :param columns: list of column names to return - defaults to all columns
+        :param order_by: column name or list of column names - prefix a name with - for descending
+        :param limit: maximum number of records
+        :param kwargs: contains columns and values to use as filter - see filter_clauses
+        :return: list of dictionary for each record
+        """
+        self.get_session()
+        query = self._core_select(columns=columns,order_by=order_by,limit=limit,**kwargs)
+        result = [dict(row._mapping) for row in self.session.execute(query)]
+        self.close_session()
+        return result
+
+    def select_iter(self,batch_size=1000,**kwargs):
+        """
+        Generator version of select_rows which streams the records from a server side cursor, fetching
+        batch_size rows at a time.  The session is closed when the generator is exhausted, closed or
+        garbage collected.
+        :param batch_size: number of rows fetched from the cursor at a time
+        :param kwargs: columns, order_by, limit and filters as in select_rows
+        :return: generator of dictionary for each record
+        """
+        self.get_session()
+        # the generator owns this session so calls made on the operator while iterating get their own
+        session, shared_session = self.session, self.shared_session
+        self.session = None
+        query = self._core_select(**kwargs)
+        try:
+            result = session.execute(query, execution_options={'stream_results': True,
+                                                               'max_row_buffer': batch_size})
+            for partition in result.partitions(batch_size):
+                for row in partition:
+                    yield dict(row._mapping)
+        finally:
+            if not shared_session:
+                session.close()
+
+    @session_method
+    def count(self,**kwargs):
+        """
+        Count the records matching the filters
+        :param kwargs: contains columns and values to use as filter - see filter_clauses
+        :return: number of records
+        """
+        self.get_session()
+        query = select(func.count()).select_from(self.db_table_class.__table__).where(*self.filter_clauses(kwargs))
+        result = self.session.execute(query).scalar()
+        self.close_session()
+        return result
+
+    @session_method
+    def exists(self,**kwargs):
+        """
+        Check if any record matches the filters
+        :param kwargs: contains columns and values to use as filter - see filter_clauses
+        :return: True or False
+        """
+        self.get_session()
+        table = self.db_table_class.__table__
+        query = select(exists_clause().select_from(table).where(*self.filter_clauses(kwargs)))
+        result = self.session.execute(query).scalar()
+        self.close_session()
+        return bool(result)
+
+    def map_select(self,filter_list,return_type='one',max_workers=None):
+        """
+        Run independent selects in parallel on a thread pool no larger than the connection pool.  Each call has
+        its own session so the selects do not join the caller's unit of work.
+        :param filter_list: list of dictionary of filters, one per select
+        :param return_type: all, one or first
+        :param max_workers: number of threads - defaults to the capacity of the connection pool
+        :return: list of the results in the order of filter_list
+        """
+        return self._map(lambda filters: self._select(return_type=return_type,**filters),filter_list,max_workers)
+
+    def map_update(self,records,max_workers=None):
+        """
+        Run independent updates in parallel on a thread pool no larger than the connection pool.  Each update is
+        committed in its own transaction.
+        :param records: list of dictionary of columns and values, one per update
+        :param max_workers: number of threads - defaults to the capacity of the connection pool
+        :return: list of dictionary versions of the updated or inserted records in the order of records
+        """
+        return self._map(lambda record: self.update(**record),records,max_workers)
+
+    def _map(self,function,items,max_workers=None):
+        items = list(items)
+        if not items:
+            return []
+        max_workers = min(len(items), max_workers or get_pool_capacity() or self.default_map_workers)
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            return list(executor.map(function, items))
+        finally:
+            executor.shutdown(wait=True)
+
     def select_one(self,**kwargs):
         return self._select(return_type='one',**kwargs)
 
@@ -116,10 +530,166 @@ class BaseOperator(object):
         return self._select(return_type='first',**kwargs)
 
 
+class DefinitionTableOperator(BaseOperator):
+    """
+    Defines methods and attributes for database tables holding definitions which rarely change.  Reads can be
+    cached per operator class with enable_cache.  Expired entries are revalidated by comparing the primary key,
+    modified_dttm and etag of the matching records, and the cache is cleared when the operator writes.
+    """
+    cache = None  # Set by enable_cache
+
+    @classmethod
+    def enable_cache(cls,max_size=256,ttl=300):
+        """
+        Cache the results of select, select_one and select_first for this operator class
+        :param max_size: maximum number of cached reads - least recently used reads are evicted
+        :param ttl: seconds before a cached read is revalidated against the database
+        :return:
+        """
+        cls.cache = RecordCache(max_size=max_size, ttl=ttl)
+
+    @classmethod
+    def disable_cache(cls):
+        cls.cache = None
+
+    @classmethod
+    def cache_stats(cls):
+        """
+        Return hit, miss, revalidation and eviction counters of the cache
+        :return: dictionary of counters or None if the cache is not enabled
+        """
+        return cls.cache.stats() if cls.cache is not None else None
+
+    def update(self,**kwargs):
+        record_dict = super(DefinitionTableOperator, self).update(**kwargs)
+        if self.cache is not None:
+            self.cache.clear()
+        return record_dict
+
+    def bulk_update(self,records,conflict_keys=('id',),chunk_size=None):
+        result_list = super(DefinitionTableOperator, self).bulk_update(records,conflict_keys,chunk_size)
+        if self.cache is not None:
+            self.cache.clear()
+        return result_list
+
+    def _select(self,return_type='all',**kwargs):
+        cache = self.cache
+        key = cache.make_key(return_type, **kwargs) if cache is not None else None
+        if key is None:
+            return super(DefinitionTableOperator, self)._select(return_type,**kwargs)
+        entry = cache.get(key)
+        if entry is not None:
+            result, signature, expired = entry
+            if not expired or self._signature(return_type, kwargs) == signature:
+                if expired:
+                    cache.renew(key)
+                return copy.deepcopy(result)
+        result = super(DefinitionTableOperator, self)._select(return_type,**kwargs)
+        cache.put(key, copy.deepcopy(result), self._result_signature(result))
+        return result
+
+    def _signature_columns(self):
+        table = self.db_table_class.__table__
+        return list(table.primary_key) + [table.c[name] for name in ('modified_dttm', 'etag') if name in table.c]
+
+    @session_method
+    def _signature(self,return_type,filters):
+        """
+        Select the primary key, modified_dttm and etag of the records a read returns - for first only the
+        first record in the same order
+        :return: set of tuples
+        """
+        if return_type == 'first':
+            filters = dict(filters, limit=1)
+        self.get_session()
+        query = self._core_select(columns=[column.name for column in self._signature_columns()],**filters)
+        signature = frozenset(tuple(row) for row in self.session.execute(query))
+        self.close_session()
+        return signature
+
+    def _result_signature(self,result):
+        if result is None:
+            result = []
+        elif isinstance(result, dict):
+            result = [result]
+        names = [column.name for column in self._signature_columns()]
+        return frozenset(tuple(record.get(name) for name in names) for record in result)
+
+
 class LogTableOperator(BaseOperator):
     """
     Defines methods and attributes for database tables used to log run information
     """
+    source_column = 'source_id'  # column with the id of the definition the log records belong to
+    purge_chunk_size = 5000  # records deleted per transaction by purge
+
+    def purge(self,before,source_ids=None,archive=False,dry_run=False,chunk_size=None,sleep_seconds=0):
+        """
+        Delete the records created before a date in chunks ordered by the created_dttm index, committing each
+        chunk in its own short transaction
+        :param before: datetime - records with an earlier created_dttm are removed
+        :param source_ids: only remove records of these sources - defaults to all records
+        :param archive: copy the records to <table>_archive before deleting them - columns missing from an
+                        existing archive table are not copied
+        :param dry_run: only count the records which would be removed
+        :param chunk_size: records per transaction - defaults to purge_chunk_size
+        :param sleep_seconds: pause between chunks to limit the load on the database
+        :return: number of records removed (or which would be removed)
+        """
+        table = self.db_table_class.__table__
+        conditions = [table.c.created_dttm < before]
+        if source_ids is not None:
+            conditions.append(table.c[self.source_column].in_(list(source_ids)))
+        engine = get_engine()
+        if dry_run:
+            with engine.connect() as connection:
+                return connection.execute(select(func.count()).select_from(table).where(*conditions)).scalar()
+        chunk_size = chunk_size or self.purge_chunk_size
+        archive_columns = None
+        if archive:
+            archive_table = self.get_archive_table(create=True)
+            archive_columns = [column for column in table.c if column.name in archive_table.c]
+        removed = 0
+        while True:
+            with engine.begin() as connection:
+                ids = [row.id for row in connection.execute(select(table.c.id).where(*conditions)
+                                                            .order_by(table.c.created_dttm).limit(chunk_size))]
+                if ids:
+                    if archive_columns:
+                        connection.execute(insert(archive_table).from_select(
+                            [column.name for column in archive_columns],
+                            select(*archive_columns).where(table.c.id.in_(ids))))
+                    connection.execute(delete(table).where(table.c.id.in_(ids)))
+            removed += len(ids)
+            if len(ids) < chunk_size:
+                break
+            if sleep_seconds:
+                time.sleep(sleep_seconds)
+        return removed
+
+    def get_archive_table(self,create=False):
+        """
+        Return the <table>_archive table as it exists in the database, or else with the columns of the log table
+        and no constraints or indexes.  An existing archive table is not altered when the log table gains columns.
+        :param create: create the table in the database if it does not exist
+        :return: sqlalchemy Table
+        """
+        table = self.db_table_class.__table__
+        name = table.name + '_archive'
+        engine = get_engine()
+        if inspect(engine).has_table(name):
+            return Table(name, MetaData(), autoload_with=engine)
+        archive_table = Table(name, MetaData(), *[Column(column.name, column.type) for column in table.c])
+        if create:
+            archive_table.create(bind=engine, checkfirst=True)
+        return archive_table
+
+    def bulk_update(self,records,conflict_keys=('id',),chunk_size=None):
+        # Core inserts bypass the attribute event which keeps run_key in sync with run_id
+        records = [dict(record, run_key=to_run_key(record['run_id'])) if 'run_id' in record else record
+                   for record in records]
+        return super(LogTableOperator, self).bulk_update(records,conflict_keys,chunk_size)
+
     def set_status(self,pk,status):
         """
         Special method for setting only the status of an existing record
@@ -129,19 +699,192 @@ class LogTableOperator(BaseOperator):
         """
         self.update(id=pk,status=status)
 
+    @session_method
+    def set_status_many(self,pks,status,expected_status=None):
+        """
+        Set the status of many records with one UPDATE statement.  When expected_status is provided only records
+        currently in that status are changed, which makes the call a compare-and-set.
+        :param pks: list of id values
+        :param status: new status
+        :param expected_status: status the records must have to be changed
+        :return: list of the id values of the records which were changed
+        """
+        pks = list(pks)
+        if not pks:
+            return []
+        table = self.db_table_class.__table__
+        conditions = [table.c.id.in_(pks)]
+        if expected_status is not None:
+            conditions.append(table.c.status == expected_status)
+        statement = update(table).where(*conditions).values(status=status)
+        self.get_session()
+        if self.session.get_bind().dialect.name == 'postgresql':
+            changed = [row.id for row in self.session.execute(statement.returning(table.c.id))]
+        else:
+            # no RETURNING - select the matching ids in the same transaction before updating them
+            changed = [row.id for row in self.session.execute(select(table.c.id).where(*conditions))]
+            if changed:
+                self.session.execute(update(table).where(table.c.id.in_(changed), *conditions[1:])
+                                     .values(status=status))
+        self.commit()
+        self.close_session()
+        return changed
+
+    @session_method
+    def claim(self,n,from_status,to_status,worker_id,lease_seconds=300):
+        """
+        Atomically claim up to n records in from_status for a worker by moving them to to_status and setting a
+        lease.  Records in to_status whose lease has expired are claimed again.  On PostgreSQL the records are
+        locked with FOR UPDATE SKIP LOCKED so concurrent workers never wait on or claim the same records.
+        :param n: maximum number of records to claim
+        :param from_status: status of records waiting to be worked
+        :param to_status: status of records being worked
+        :param worker_id: identifier of the claiming worker
+        :param lease_seconds: seconds before the claim can be taken over by another worker
+        :return: list of dictionary for each claimed record
+        """
+        table = self.db_table_class.__table__
+        now = datetime.now()
+        claimable = or_(table.c.status == from_status,
+                        and_(table.c.status == to_status, table.c.lease_expires_dttm < now))
+        lease = {'status': to_status, 'claimed_by': worker_id,
+                 'lease_expires_dttm': now + timedelta(seconds=lease_seconds)}
+        candidates = select(table.c.id).where(claimable).order_by(table.c.id).limit(n)
+        self.get_session()
+        if self.session.get_bind().dialect.name == 'postgresql':
+            candidates = candidates.with_for_update(skip_locked=True).scalar_subquery()
+            statement = update(table).where(table.c.id.in_(candidates)).values(**lease).returning(*table.c)
+            claimed = [dict(row._mapping) for row in self.session.execute(statement)]
+        else:
+            # without SKIP LOCKED re-check the condition in the update and read back the records holding our lease
+            candidate_ids = [row.id for row in self.session.execute(candidates)]
+            claimed = []
+            if candidate_ids:
+                self.session.execute(update(table).where(table.c.id.in_(candidate_ids), claimable).values(**lease))
+                claimed = [dict(row._mapping) for row in self.session.execute(
+                    select(table).where(table.c.id.in_(candidate_ids), table.c.claimed_by == worker_id,
+                                        table.c.lease_expires_dttm == lease['lease_expires_dttm'])
+                    .order_by(table.c.id))]
+        self.commit()
+        self.close_session()
+        return claimed
+
+    @session_method
+    def release(self,pks,status,worker_id):
+        """
+        Move records claimed by a worker to a new status and clear their lease.  Records whose lease was taken
+        over by another worker are not changed.
+        :param pks: list of id values
+        :param status: new status
+        :param worker_id: identifier of the worker holding the claim
+        :return: list of the id values of the records which were released
+        """
+        pks = list(pks)
+        if not pks:
+            return []
+        table = self.db_table_class.__table__
+        conditions = [table.c.id.in_(pks), table.c.claimed_by == worker_id]
+        values = {'status': status, 'claimed_by': None, 'lease_expires_dttm': None}
+        self.get_session()
+        if self.session.get_bind().dialect.name == 'postgresql':
+            released = [row.id for row in self.session.execute(
+                update(table).where(*conditions).values(**values).returning(table.c.id))]
+        else:
+            released = [row.id for row in self.session.execute(select(table.c.id).where(*conditions))]
+            if released:
+                self.session.execute(update(table).where(table.c.id.in_(released), *conditions[1:]).values(**values))
+        self.commit()
+        self.close_session()
+        return released
+
+    @session_method
+    def page(self,after_id=None,limit=100,cursor=None,**kwargs):
+        """
+        Return one page of records ordered by id using keyset pagination (id > last id of the previous page)
+        so every page costs the same regardless of how deep it is
+        :param after_id: return records with an id greater than this value
+        :param limit: maximum number of records in the page - at least 1
+        :param cursor: next_cursor token from the previous page - used instead of after_id
+        :param kwargs: contains columns and values to use as filter - see filter_clauses
+        :return: dictionary with the list of records and the next_cursor token (None on the last page)
+        """
+        table = self.db_table_class.__table__
+        return self._page(select(table).where(*self.filter_clauses(kwargs)), after_id, limit, cursor)
+
+    def _page(self,query,after_id,limit,cursor):
+        """
+        Run a select on the table for one page of records ordered by id
+        """
+        if limit < 1:
+            raise ValueError("Page limit must be at least 1, got {0}".format(limit))
+        if cursor:
+            after_id = self.decode_cursor(cursor)
+        table = self.db_table_class.__table__
+        if after_id is not None:
+            query = query.where(table.c.id > after_id)
+        # fetch one extra row to know if there is another page
+        query = query.order_by(table.c.id).limit(limit + 1)
+        self.get_session()
+        records = [dict(row._mapping) for row in self.session.execute(query)]
+        self.close_session()
+        next_cursor = self.encode_cursor(records[limit - 1]['id']) if len(records) > limit else None
+        return {'records': records[:limit], 'next_cursor': next_cursor}
+
+    def encode_cursor(self,last_id):
+        """
+        Create the opaque page cursor token for the last id of a page
+        :param last_id: id of the last record in the page
+        :return: cursor token
+        """
+        token = '{0}:{1}'.format(self.db_table_class.__tablename__, last_id)
+        return base64.urlsafe_b64encode(token.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self,cursor):
+        """
+        Return the last id from a page cursor token created by encode_cursor
+        :param cursor: cursor token
+        :return: last id
+        """
+        try:
+            table_name, last_id = base64.urlsafe_b64decode(str(cursor)).decode('utf-8').rsplit(':', 1)
+            last_id = int(last_id)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid page cursor {0}".format(cursor))
+        if table_name != self.db_table_class.__tablename__:
+            raise ValueError("Page cursor {0} is for table {1}".format(cursor, table_name))
+        return last_id
+
     def get_max_run_id(self,source_id, date_filter=None):
         """
         Return the max run id for a particular source, but not greater than date_filter if provided.
         :param source_id: id value for the source
         :param date_filter: date cap in the format YYYYMMDDHH24MISS
-        :return: run id
+        :return: run id or None if the source has no runs
+        """
+        return self.get_max_run_ids([source_id], date_filter).get(source_id)
+
+    @session_method
+    def get_max_run_ids(self,source_ids,date_filter=None):
+        """
+        Return the max run id for each source in one query, but not greater than date_filter if provided.
+        Uses the (source, run_key) index.
+        :param source_ids: list of id values for the sources
+        :param date_filter: date cap in the format YYYYMMDDHH24MISS
+        :return: dictionary of source id and run id - None for sources without runs
         """
-        if not self.session:
-            self.get_session()
-        max_run_id = (self.session.query(func.max(cast(self.db_table_class.run_id,BigInteger)))
-                                  .filter_by(source_id=source_id))
+        source_ids = list(source_ids)
+        if not source_ids:
+            return {}
+        table = self.db_table_class.__table__
+        source_column = table.c[self.source_column]
+        query = (select(source_column, func.max(table.c.run_key))
+                 .where(source_column.in_(source_ids))
+                 .group_by(source_column))
         if date_filter:
-            max_run_id = max_run_id.filter(cast(self.db_table_class.run_id,BigInteger) <= date_filter)
-        result = max_run_id.scalar()
+            query = query.where(table.c.run_key <= int(date_filter))
+        self.get_session()
+        max_run_ids = dict((source_id, None) for source_id in source_ids)
+        max_run_ids.update((source_id, int(run_key)) for source_id, run_key in self.session.execute(query)
+                           if run_key is not None)
         self.close_session()
-        return int(result)
+        return max_run_ids
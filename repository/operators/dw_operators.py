@@ -2,39 +2,62 @@
 repository.operators.dw_operators - Operators used for datawarehouse tables in metadata repository
 
 Version History:
-
+0.2 agent 10/18/2026
+    DataWarehouseDefinitionOperator is a DefinitionTableOperator so its reads can be cached
+0.2.1 agent 10/18/2026
+    Set source_column of the log operators to dw_id
+0.3 agent 10/18/2026
+    get_table_list loads all tables and their sources in two queries and reports all missing tables at once
+0.3.1 agent 10/18/2026
+    Methods which open a session discard it when they raise
 """
+from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
+
 from repository.metadata.models import DataWarehouseDefinition, DataWarehouseDFLog, DataWarehouseARLog
-from repository.operators.base_operator import BaseOperator, LogTableOperator
+from repository.operators.base_operator import DefinitionTableOperator, LogTableOperator, session_method
 
-__version__ = "0.1"
+__version__ = "0.3.1"
 __date__ = '2/4/2017'
-__updated__ = '2/4/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
 
-class DataWarehouseDefinitionOperator(BaseOperator):
+class DataWarehouseDefinitionOperator(DefinitionTableOperator):
     """
     Defines methods and attributes for database operations on the DataWarehouseDefinition table
     """
     db_table_class = DataWarehouseDefinition
 
+    @session_method
     def get_table_list(self,table_name_list):
-        if not self.session:
-            self.get_session()
-        query = self.session.query(self.db_table_class)
-        result_list = []
-        for table_name in table_name_list:
-            dw_table_record = query.filter_by(table_name=table_name).one()
+        """
+        Return the definitions of the tables with their import sources, loading all tables in one query and all
+        of their sources in a second query
+        :param table_name_list: list of table names
+        :return: list of dictionary for each table in the order of table_name_list
+        """
+        table_name_list = list(table_name_list)
+        self.get_session()
+        query = (self.session.query(self.db_table_class)
+                 .filter(self.db_table_class.table_name.in_(set(table_name_list)))
+                 .options(selectinload(self.db_table_class.sources)))
+        dw_table_dicts = {}
+        duplicate_names = set()
+        for dw_table_record in query:
+            if dw_table_record.table_name in dw_table_dicts:
+                duplicate_names.add(dw_table_record.table_name)
             dw_table_dict = self.convert_to_dict(dw_table_record)
-            if dw_table_record.sources:
-                source_list = [self.convert_to_dict(source) for source in dw_table_record.sources]
-            else:
-                source_list = []
-            dw_table_dict['sources'] = source_list
-            result_list.append(dw_table_dict)
+            dw_table_dict['sources'] = [self.convert_to_dict(source) for source in dw_table_record.sources]
+            dw_table_dicts[dw_table_record.table_name] = dw_table_dict
         self.close_session()
-        return result_list
+        if duplicate_names:
+            raise MultipleResultsFound("Multiple data warehouse definitions found for tables: {0}".format(
+                ', '.join(sorted(duplicate_names))))
+        missing_names = [table_name for table_name in table_name_list if table_name not in dw_table_dicts]
+        if missing_names:
+            raise NoResultFound("No data warehouse definition found for tables: {0}".format(', '.join(missing_names)))
+        return [dw_table_dicts[table_name] for table_name in table_name_list]
 
 
 class DataWarehouseDFLogOperator(LogTableOperator):
@@ -42,6 +65,7 @@ class DataWarehouseDFLogOperator(LogTableOperator):
     Defines methods and attributes for database operations on the DataWarehouseDFLog table
     """
     db_table_class = DataWarehouseDFLog
+    source_column = 'dw_id'
 
 
 class DataWarehouseARLogOperator(LogTableOperator):
@@ -49,3 +73,4 @@ class DataWarehouseARLogOperator(LogTableOperator):
     Defines methods and attributes for database operations on the DataWarehouseARLog table
     """
     db_table_class = DataWarehouseARLog
+    source_column = 'dw_id'
@@ -0,0 +1,270 @@
+"""
+repository.operators.event_operators - Operators for database actions on the Event table
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+    Added EventWriter to buffer events and insert them in batches from a background thread
+0.2 agent 10/18/2026
+    Added EventOperator.query for time range queries and partition management for monthly partitions
+0.2.1 agent 10/18/2026
+    Open EventWriters are tracked with weak references so closed writers are not kept alive until exit
+    close waits for writes in progress so no event is left in the buffer after the final flush
+0.2.2 agent 10/18/2026
+    COPY batches are formatted by repository.utils.db_utils.copy_rows
+"""
+import atexit
+import json
+import logging
+import threading
+import time
+import weakref
+from datetime import datetime
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+from sqlalchemy import insert, select, delete
+
+from repository.connection import get_engine
+from repository.metadata.models import Event
+from repository.operators.base_operator import BaseOperator
+from repository.utils import partition_utils
+from repository.utils.db_utils import copy_rows
+
+__version__ = "0.2.2"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = []
+
+logger = logging.getLogger(__name__)
+
+# writers not closed yet - flushed when the process exits
+_open_writers = weakref.WeakSet()
+
+
+@atexit.register
+def _close_writers():
+    for writer in list(_open_writers):
+        writer.close()
+
+
+class EventOperator(BaseOperator):
+    """
+    Defines methods and attributes for database operations on the Event table
+    """
+    db_table_class = Event
+    purge_chunk_size = 10000  # rows deleted per transaction when purging an unpartitioned table
+
+    def query(self,start,end,category=None,group=None,**kwargs):
+        """
+        Select the events with start <= event_dttm < end.  On a partitioned table only the partitions of the
+        range are read, otherwise the (event_category, event_group, event_dttm) and event_dttm indexes are used.
+        :param start: datetime of the first event
+        :param end: datetime after the last event
+        :param category: event_category
+        :param group: event_group
+        :param kwargs: columns, order_by, limit and filters as in select_rows
+        :return: list of dictionary for each event
+        """
+        if category is not None:
+            kwargs['event_category'] = category
+        if group is not None:
+            kwargs['event_group'] = group
+        kwargs.setdefault('order_by', 'event_dttm')
+        return self.select_rows(event_dttm__gte=start,event_dttm__lt=end,**kwargs)
+
+    def is_partitioned(self):
+        with get_engine().connect() as connection:
+            return partition_utils.is_partitioned(connection, Event.__tablename__)
+
+    def create_partitions(self,start,end):
+        """
+        Create the missing monthly partitions from the month of start to the month of end
+        :return: list of the names of the partitions created - empty if the table is not partitioned
+        """
+        with get_engine().begin() as connection:
+            if not partition_utils.is_partitioned(connection, Event.__tablename__):
+                return []
+            return partition_utils.create_partitions(connection, Event.__tablename__, start, end)
+
+    def purge(self,before):
+        """
+        Remove the events earlier than before.  Partitions holding only older events are dropped, and the
+        remaining older events are deleted in chunks of purge_chunk_size with a transaction per chunk.
+        :param before: datetime
+        :return: dictionary with the list of dropped partitions and the number of deleted rows
+        """
+        engine = get_engine()
+        with engine.begin() as connection:
+            dropped = []
+            if partition_utils.is_partitioned(connection, Event.__tablename__):
+                dropped = partition_utils.drop_partitions(connection, Event.__tablename__, before)
+        table = Event.__table__
+        deleted = 0
+        while True:
+            with engine.begin() as connection:
+                chunk = (select(table.c.id).where(table.c.event_dttm < before)
+                         .order_by(table.c.event_dttm).limit(self.purge_chunk_size).scalar_subquery())
+                count = connection.execute(delete(table).where(table.c.id.in_(chunk))).rowcount
+            deleted += count
+            if count < self.purge_chunk_size:
+                break
+        return {'dropped_partitions': dropped, 'deleted_rows': deleted}
+
+
+class EventWriter(object):
+    """
+    Buffers Event records in memory and inserts them from a background thread in batches of flush_size, or
+    sooner when the oldest buffered event is flush_interval seconds old.  Batches are written with a multi-row
+    INSERT, or with COPY when use_copy is set and the driver is psycopg2.
+
+    When the buffer holds max_buffer events, write blocks for up to put_timeout seconds (None waits forever,
+    0 never waits) and the event is counted as dropped if there is still no room.  Events of a batch which
+    fails to insert are counted as failed.  The buffer is flushed when close is called or the process exits.
+    Events written after close are counted as dropped.
+    """
+    def __init__(self,flush_size=500,flush_interval=1.0,max_buffer=10000,put_timeout=None,use_copy=False):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.use_copy = use_copy
+        self._queue = queue.Queue(maxsize=max_buffer)
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # held while an event is checked and buffered so close can not slip in between
+        self._write_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.flushes = 0
+        self._thread = threading.Thread(target=self._run, name='EventWriter')
+        self._thread.daemon = True
+        self._thread.start()
+        _open_writers.add(self)
+
+    def write(self,**kwargs):
+        """
+        Buffer an event - event_dttm defaults to now
+        :param kwargs: Event columns and values
+        :return: True if the event was buffered, False if it was dropped
+        """
+        now = datetime.now()
+        kwargs.setdefault('event_dttm', now)
+        kwargs.setdefault('created_dttm', now)
+        kwargs.setdefault('modified_dttm', now)
+        with self._write_lock:
+            if self._stop.is_set():
+                self._count('dropped', 1)
+                return False
+            try:
+                if self.put_timeout == 0:
+                    self._queue.put_nowait(kwargs)
+                else:
+                    self._queue.put(kwargs, timeout=self.put_timeout)
+            except queue.Full:
+                self._count('dropped', 1)
+                return False
+        return True
+
+    def close(self,timeout=None):
+        """
+        Stop accepting events, flush the buffer and stop the background thread
+        :param timeout: seconds to wait for the final flush
+        :return:
+        """
+        with self._write_lock:
+            closing = not self._stop.is_set()
+            self._stop.set()
+        if closing:
+            _open_writers.discard(self)
+            self._thread.join(timeout)
+
+    def stats(self):
+        with self._lock:
+            return {'written': self.written,
+                    'dropped': self.dropped,
+                    'failed': self.failed,
+                    'flushes': self.flushes,
+                    'pending': self._queue.qsize()}
+
+    def _count(self,name,count):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + count)
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+        # drain what is left after close
+        while True:
+            batch = self._collect(wait=False)
+            if not batch:
+                break
+            self._flush(batch)
+
+    def _collect(self,wait=True):
+        """
+        Take up to flush_size events from the buffer, waiting at most flush_interval after the first event
+        """
+        batch = []
+        deadline = None
+        while len(batch) < self.flush_size:
+            try:
+                if not wait:
+                    batch.append(self._queue.get_nowait())
+                    continue
+                if deadline is None:
+                    # wake up regularly to notice close
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+                    deadline = time.time() + self.flush_interval
+                else:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                if deadline is not None or not wait or self._stop.is_set():
+                    break
+        return batch
+
+    def _flush(self,batch):
+        try:
+            engine = get_engine()
+            if self.use_copy and engine.dialect.driver == 'psycopg2':
+                self._copy(engine, batch)
+            else:
+                table = Event.__table__
+                # same columns in every row so the driver can batch the insert
+                columns = set()
+                for event in batch:
+                    columns.update(column for column in event if column in table.c)
+                rows = [dict((column, event.get(column)) for column in columns) for event in batch]
+                with engine.begin() as connection:
+                    connection.execute(insert(table), rows)
+        except Exception:
+            logger.exception("Failed to write %d events", len(batch))
+            self._count('failed', len(batch))
+        else:
+            self._count('written', len(batch))
+        self._count('flushes', 1)
+
+    @staticmethod
+    def _copy(engine,batch):
+        """
+        Write a batch with COPY ... FROM STDIN using the psycopg2 connection
+        """
+        table = Event.__table__
+        columns = [column.name for column in table.c if column.name != 'id']
+        connection = engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            copy_rows(cursor, table.name, columns, batch, encoders={'event_payload': json.dumps})
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
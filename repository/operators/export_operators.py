@@ -6,17 +6,21 @@ Version History:
     Initial Version
 0.1.1 jwd3 2/7/2017
     Changed StatusTableOperator to LogTableOperator
+0.2 agent 10/18/2026
+    ExportDefinitionOperator is a DefinitionTableOperator so its reads can be cached
+0.2.1 agent 10/18/2026
+    Set source_column of ExportLogOperator to export_id
 """
 from repository.metadata.models import ExportDefinition, ExportLog
-from repository.operators.base_operator import BaseOperator, LogTableOperator
+from repository.operators.base_operator import DefinitionTableOperator, LogTableOperator
 
-__version__ = "0.1.1"
+__version__ = "0.2.1"
 __date__ = '02/06/2017'
-__updated__ = '02/07/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
 
-class ExportDefinitionOperator(BaseOperator):
+class ExportDefinitionOperator(DefinitionTableOperator):
     """
     Defines methods and attributes for database operations on the ExportDefinition table
     """
@@ -28,3 +32,4 @@ class ExportLogOperator(LogTableOperator):
     Defines methods and attributes for database operations on the ExportLog table
     """
     db_table_class = ExportLog
+    source_column = 'export_id'
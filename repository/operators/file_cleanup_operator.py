@@ -2,19 +2,254 @@
 <PATH> file_cleanup_operator - <DESCRIPTION>
 
 Version History:
-
+0.2 agent 10/18/2026
+    FileCleanupOperator is a DefinitionTableOperator so its reads can be cached
+0.3 agent 10/18/2026
+    Added compile_rules and FileCleanupRuleMatcher to find the rule of a file without testing every rule
+0.3.1 agent 10/18/2026
+    Added FileCleanupRuleMatcher.root_paths and descends_into for directory scans
+0.3.2 agent 10/18/2026
+    Rules above an archive path do not apply to the archived files, so a scan does not archive them again
 """
-from repository.operators.base_operator import BaseOperator
+import fnmatch
+import logging
+import re
+import time
+from datetime import datetime
+
+from repository.operators.base_operator import DefinitionTableOperator
 from repository.metadata.models import FileCleanup
 
-__version__ = "0.1"
+__version__ = "0.3.2"
 __date__ = '2/24/2017'
-__updated__ = '2/24/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
+logger = logging.getLogger(__name__)
+
+global_flags = re.compile(r'^\(\?[aiLmsux]+\)')
+
 
-class FileCleanupOperator(BaseOperator):
+class FileCleanupOperator(DefinitionTableOperator):
     """
     Defines methods and attributes for database operations on the File Cleanup table
     """
     db_table_class = FileCleanup
+
+    def compile_rules(self,hdfs=None,glob=False):
+        """
+        Compile the active rules into a matcher which finds the rule of a file without testing every rule
+        :param hdfs: True for the HDFS rules only, False for the local rules only - defaults to all rules
+        :param glob: filename_pattern is a shell wildcard pattern instead of a regular expression
+        :return: FileCleanupRuleMatcher
+        """
+        filters = {'active_flg': True}
+        if hdfs is not None:
+            filters['hdfs_path_flg'] = hdfs
+        return FileCleanupRuleMatcher(self.select_rows(order_by='rule_id', **filters), glob=glob)
+
+
+class FileCleanupRuleMatcher(object):
+    """
+    Finds the cleanup rule of a file.  Rules are stored in a trie of their directories and the filename patterns
+    of each directory are combined into one regular expression, so a lookup costs one dictionary step per
+    directory level and at most two regular expression matches per level.
+
+    A rule applies to the files in its path, and to the files in the subdirectories of its path when
+    recursive_flg is set.  The rule of the nearest directory wins; among the rules of one directory the lowest
+    rule_id whose filename_pattern matches the whole file name wins.  An empty filename_pattern matches every
+    file.
+    The archive paths of the archiving rules are excluded from the rules of the directories above them, so
+    archived files are only matched by rules whose path is at or below the archive path.
+    Rules whose pattern does not compile are left out and listed in invalid_rules.
+    """
+    def __init__(self,rules,glob=False):
+        self.glob = glob
+        self.rules = []
+        self.invalid_rules = []
+        self.archive_paths = []  # archive paths on the same file system as the rule paths
+        self._archive_root = {}  # trie of the archive path names - None marks the end of an archive path
+        self._root = _RuleNode()
+        for rule in sorted(rules, key=lambda rule: rule['rule_id']):
+            if ((rule.get('cleanup_action') or '').upper() == 'A' and rule.get('archive_path') and
+                    bool(rule.get('hdfs_archive_path_flg')) == bool(rule.get('hdfs_path_flg'))):
+                self.archive_paths.append(rule['archive_path'])
+                node = self._archive_root
+                for name in self.split_path(rule['archive_path']):
+                    node = node.setdefault(name, {})
+                node[None] = True
+            pattern = rule.get('filename_pattern') or ''
+            try:
+                regex = fnmatch.translate(pattern) if glob and pattern else self.anchor(pattern or '.*')
+                re.compile(regex)
+            except re.error as e:
+                logger.warning("Skipping file cleanup rule %s - invalid filename_pattern %r: %s",
+                               rule['rule_id'], pattern, e)
+                self.invalid_rules.append(rule)
+                continue
+            node = self._root
+            for name in self.split_path(rule['path']):
+                node = node.children.setdefault(name, _RuleNode())
+            node.add(rule, regex)
+            self.rules.append(rule)
+        self._root.compile()
+
+    @staticmethod
+    def anchor(pattern):
+        """
+        Make a regular expression match the whole file name, keeping leading inline flags such as (?i) in front
+        """
+        flags = global_flags.match(pattern)
+        flags = flags.group(0) if flags else ''
+        return '{0}(?:{1})\\Z'.format(flags, pattern[len(flags):])
+
+    @staticmethod
+    def split_path(path):
+        return [name for name in (path or '').split('/') if name]
+
+    def match(self,path):
+        """
+        Return the rule which applies to a file
+        :param path: full path of the file
+        :return: rule dictionary or None
+        """
+        names = self.split_path(path)
+        if not names:
+            return None
+        filename = names.pop()
+        nodes = [self._root]
+        for name in names:
+            node = nodes[-1].children.get(name)
+            if node is None:
+                break
+            nodes.append(node)
+        # only the rules of the file's own directory apply without recursive_flg, and only the rules at or below
+        # an archive path apply in it
+        for depth in range(len(nodes) - 1, self.archive_depth(names) - 1, -1):
+            rule = nodes[depth].match(filename, recursive_only=depth < len(names))
+            if rule is not None:
+                return rule
+        return None
+
+    def root_paths(self):
+        """
+        Return the rule paths which are not under another rule path - the directories a scan starts from
+        """
+        roots = []
+        for names in sorted(set(tuple(self.split_path(rule['path'])) for rule in self.rules)):
+            if not roots or names[:len(roots[-1])] != roots[-1]:
+                roots.append(names)
+        return ['/' + '/'.join(names) for names in roots]
+
+    def descends_into(self,path):
+        """
+        Check if a rule can apply to the files in a directory or in its subdirectories
+        :param path: directory
+        :return: True if a recursive rule covers the directory or a rule path is at or below it
+        """
+        names = self.split_path(path)
+        archive_depth = self.archive_depth(names)
+        node = self._root
+        for depth, name in enumerate(names):
+            if node.recursive_regex is not None and depth >= archive_depth:
+                return True
+            node = node.children.get(name)
+            if node is None:
+                return False
+        return True
+
+    def archive_depth(self,names):
+        """
+        Return the number of names in the deepest archive path containing a directory
+        :param names: directory split into names by split_path
+        :return: 0 if the directory is not in an archive path
+        """
+        depth = 0
+        node = self._archive_root
+        for index, name in enumerate(names):
+            node = node.get(name)
+            if node is None:
+                break
+            if None in node:
+                depth = index + 1
+        return depth
+
+    @staticmethod
+    def is_expired(rule,mtime,now=None):
+        """
+        Check if a file is older than the retention_period (days) of its rule
+        :param rule: rule dictionary
+        :param mtime: modification time of the file as a datetime or seconds since the epoch
+        :param now: time to measure the age from, same type as mtime - defaults to now
+        :return: False if the rule has no retention_period
+        """
+        if rule is None or rule.get('retention_period') is None:
+            return False
+        if isinstance(mtime, datetime):
+            age = ((now or datetime.now()) - mtime).total_seconds()
+        else:
+            age = (time.time() if now is None else now) - mtime
+        return age > rule['retention_period'] * 86400
+
+    def evaluate(self,path,mtime,now=None):
+        """
+        Return the rule of a file and whether the file is past the rule's retention_period
+        :param path: full path of the file
+        :param mtime: modification time of the file as a datetime or seconds since the epoch
+        :param now: time to measure the age from, same type as mtime - defaults to now
+        :return: tuple of rule dictionary (None when no rule applies) and expired flag
+        """
+        rule = self.match(path)
+        return rule, self.is_expired(rule, mtime, now)
+
+
+class _RuleNode(object):
+    """
+    Directory in the rule trie with the combined patterns of its rules
+    """
+    __slots__ = ('children', 'rules', 'patterns', 'all_regex', 'recursive_regex')
+
+    def __init__(self):
+        self.children = {}
+        self.rules = []
+        self.patterns = []
+        self.all_regex = None
+        self.recursive_regex = None
+
+    def add(self,rule,regex):
+        self.rules.append(rule)
+        self.patterns.append(regex)
+
+    def compile(self):
+        if self.rules:
+            self.all_regex = self._combine(range(len(self.rules)))
+            self.recursive_regex = self._combine([i for i, rule in enumerate(self.rules) if rule.get('recursive_flg')])
+        for child in self.children.values():
+            child.compile()
+
+    def _combine(self,indexes):
+        """
+        One named group per rule - alternatives are tried in rule_id order and lastgroup names the match.
+        Patterns which can not be combined (repeated group names, back references, inline flags) are kept as
+        a list of (rule index, regex) tested one by one.
+        """
+        if not indexes:
+            return None
+        try:
+            return re.compile('|'.join('(?P<r{0}>{1})'.format(i, self.patterns[i]) for i in indexes))
+        except re.error:
+            return [(i, re.compile(self.patterns[i])) for i in indexes]
+
+    def match(self,filename,recursive_only=False):
+        regex = self.recursive_regex if recursive_only else self.all_regex
+        if regex is None:
+            return None
+        if isinstance(regex, list):
+            for i, rule_regex in regex:
+                if rule_regex.match(filename):
+                    return self.rules[i]
+            return None
+        found = regex.match(filename)
+        if found is None:
+            return None
+        return self.rules[int(found.lastgroup[1:])]
@@ -2,19 +2,473 @@
 repository.operators.hdfs_usage_operator - Operators for database actions on the HDFS Usage tables
 
 Version History:
-
+0.2 agent 10/18/2026
+    Added load_snapshot to bulk load hdfs dfs -count -q output for a date in one transaction
+0.3 agent 10/18/2026
+    load_snapshot fills the numeric quota columns
+    Added top_growers, growth_rates and quota_utilization computed in SQL with window functions
+0.4 agent 10/18/2026
+    load_snapshot fills path_depth and parent_path and refreshes the weekly and monthly rollups of the date
+    Added subtree_usage, usage_trend, refresh_rollups and rebuild_rollups
+    Added HdfsDiskUsageRollupOperator
+0.4.1 agent 10/18/2026
+    Methods which open a session discard it when they raise
+0.5 agent 10/18/2026
+    load_snapshot adds the new day to the rollups with one upsert per period instead of recomputing the week
+    and month - the periods are only recomputed when a day is replaced
+0.5.1 agent 10/18/2026
+    top_growers leaves out paths without a value of the metric instead of ranking their NULL growth first
+0.5.2 agent 10/18/2026
+    COPY batches are formatted by repository.utils.db_utils.copy_rows
 """
+import itertools
+import logging
 import os
+import posixpath
 import sys
-from repository.metadata.models import HdfsDiskUsage
-from repository.operators.base_operator import BaseOperator
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, delete, select, func, cast, literal, case, or_, Float
+from sqlalchemy.dialects import postgresql, sqlite
 
-__version__ = "0.1"
+from repository.connection import get_engine
+from repository.metadata.models import HdfsDiskUsage, HdfsDiskUsageRollup
+from repository.operators.base_operator import BaseOperator, session_method
+from repository.utils.db_utils import copy_rows
+from repository.utils.partition_utils import month_start, next_month
+
+__version__ = "0.5.2"
 __date__ = '1/26/2017'
-__updated__ = '1/26/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
+logger = logging.getLogger(__name__)
+
+# columns of hdfs dfs -count -q output, the path is the remainder of the line and may contain spaces
+count_quota_fields = ['quota', 'remaining_quota', 'space_quota', 'remaining_space_quota', 'directory_count',
+                      'file_count', 'length']
+unlimited_values = ('none', 'inf')
+# columns the growth analytics can be computed on
+growth_metrics = ('length', 'space_consumed_bytes', 'file_count', 'directory_count')
+rollup_periods = ('week', 'month')
+
+
+def period_range(period, value):
+    """
+    Return the first day of the week (Monday) or month containing a date and the first day of the next one
+    :param period: week or month
+    :param value: date
+    :return: tuple of dates
+    """
+    if period == 'week':
+        start = value - timedelta(days=value.weekday())
+        return start, start + timedelta(days=7)
+    if period == 'month':
+        return month_start(value), next_month(value)
+    raise ValueError("Unknown period {0} - expected one of {1}".format(period, ', '.join(rollup_periods)))
+
+
+def path_hierarchy(path):
+    """
+    Return the depth and parent directory of a path - / has depth 0 and no parent
+    """
+    path = path.rstrip('/') or '/'
+    if path == '/':
+        return 0, None
+    return path.count('/'), posixpath.dirname(path)
+
 
 class HdfsDiskUsageOperator(BaseOperator):
     """ Operations on the HDFS Disk Usage table"""
     db_table_class = HdfsDiskUsage
+    load_batch_size = 10000  # rows written per COPY or INSERT statement by load_snapshot
+
+    def load_snapshot(self,stream,create_dt,batch_size=None,use_copy=True,rollup=True):
+        """
+        Load the output of hdfs dfs -count -q for a date, replacing any rows already loaded for the date.  The
+        input is parsed lazily and written in batches - with COPY when use_copy is set and the driver is
+        psycopg2, otherwise with multi-row INSERTs - all in one transaction.  Malformed lines are skipped.
+        :param stream: file-like object or name of a local file with the command output
+        :param create_dt: date of the snapshot
+        :param batch_size: rows per statement - defaults to load_batch_size
+        :param use_copy: use COPY ... FROM STDIN on PostgreSQL
+        :param rollup: add the snapshot to the week and month rollups containing create_dt in the same transaction -
+                       the periods are recomputed when the date was loaded before
+        :return: dictionary with the number of loaded, skipped and replaced rows
+        """
+        if isinstance(create_dt, datetime):
+            create_dt = create_dt.date()
+        batch_size = batch_size or self.load_batch_size
+        table = self.db_table_class.__table__
+        counts = {'loaded': 0, 'skipped': 0, 'replaced': 0}
+        close_stream = not hasattr(stream, 'read')
+        if close_stream:
+            stream = open(stream)
+        try:
+            rows = self._parse_lines(stream, create_dt, counts)
+            engine = get_engine()
+            copy = use_copy and engine.dialect.driver == 'psycopg2'
+            with engine.begin() as connection:
+                counts['replaced'] = connection.execute(delete(table).where(table.c.create_dt == create_dt)).rowcount
+                while True:
+                    batch = list(itertools.islice(rows, batch_size))
+                    if not batch:
+                        break
+                    if copy:
+                        self._copy(connection, batch)
+                    else:
+                        connection.execute(insert(table), batch)
+                    counts['loaded'] += len(batch)
+                if rollup:
+                    self._refresh_rollups(connection, create_dt, incremental=not counts['replaced'])
+        finally:
+            if close_stream:
+                stream.close()
+        if counts['skipped']:
+            logger.warning("Skipped %d malformed lines loading the HDFS usage for %s", counts['skipped'], create_dt)
+        return counts
+
+    def _parse_lines(self,lines,create_dt,counts):
+        """
+        Generate table rows from the lines of hdfs dfs -count -q output, counting skipped lines in counts
+        """
+        path_length = self.db_table_class.__table__.c.path.type.length
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode('utf-8', 'replace')
+            if not line.strip():
+                continue
+            row = self.parse_count_line(line)
+            if row is None or (path_length and len(row['path']) > path_length):
+                counts['skipped'] += 1
+                continue
+            row['create_dt'] = create_dt
+            yield row
+
+    @staticmethod
+    def parse_count_line(line):
+        """
+        Parse one line of hdfs dfs -count -q output
+        :param line: QUOTA REMAINING_QUOTA SPACE_QUOTA REMAINING_SPACE_QUOTA DIR_COUNT FILE_COUNT CONTENT_SIZE PATH
+        :return: dictionary of HdfsDiskUsage columns or None if the line is malformed
+        """
+        values = line.split(None, len(count_quota_fields))
+        if len(values) <= len(count_quota_fields):
+            return None
+        fields = dict(zip(count_quota_fields, values))
+        try:
+            row = {'path': values[-1].rstrip('\r\n'),
+                   'directory_count': int(fields['directory_count']),
+                   'file_count': int(fields['file_count']),
+                   'length': int(fields['length'])}
+            for name in count_quota_fields[:4]:
+                if fields[name].lower() not in unlimited_values:
+                    int(fields[name])
+        except ValueError:
+            return None
+        row['quota'] = fields['quota']
+        row['space_quota'] = fields['space_quota']
+        row['space_consumed'] = None
+        row['name_quota'] = None if fields['quota'].lower() in unlimited_values else int(fields['quota'])
+        row['space_quota_bytes'] = None
+        row['space_consumed_bytes'] = None
+        if fields['space_quota'].lower() not in unlimited_values:
+            row['space_quota_bytes'] = int(fields['space_quota'])
+            if fields['remaining_space_quota'].lower() not in unlimited_values:
+                row['space_consumed_bytes'] = row['space_quota_bytes'] - int(fields['remaining_space_quota'])
+                row['space_consumed'] = str(row['space_consumed_bytes'])
+        row['path_depth'], row['parent_path'] = path_hierarchy(row['path'])
+        return row
+
+    def _copy(self,connection,batch):
+        """
+        Write a batch with COPY ... FROM STDIN on the psycopg2 connection of the current transaction
+        """
+        cursor = connection.connection.cursor()
+        try:
+            copy_rows(cursor, self.db_table_class.__tablename__, list(batch[0]), batch)
+        finally:
+            cursor.close()
+
+    def top_growers(self,start_dt,end_dt,n=10,metric='length',path_prefix=None):
+        """
+        Return the paths which grew the most between two snapshots.  Paths missing from either snapshot or
+        without a value of the metric in either one (space_consumed_bytes of a path with no space quota) are left
+        out.
+        :param start_dt: date of the earlier snapshot
+        :param end_dt: date of the later snapshot
+        :param n: number of paths - ties share a rank so more than n may be returned
+        :param metric: length, space_consumed_bytes, file_count or directory_count
+        :param path_prefix: only include paths under this directory
+        :return: list of dictionary with path, start_value, end_value, growth and rank ordered by rank
+        """
+        table = self.db_table_class.__table__
+        value = self._metric_column(metric)
+        snapshots = (select(table.c.path, table.c.create_dt, value.label('end_value'),
+                            func.lag(value, type_=value.type).over(partition_by=table.c.path,
+                                                 order_by=table.c.create_dt).label('start_value'))
+                     .where(table.c.create_dt.in_([start_dt, end_dt]), *self._path_clauses(path_prefix))
+                     .subquery())
+        growth = snapshots.c.end_value - snapshots.c.start_value
+        ranked = (select(snapshots.c.path, snapshots.c.start_value, snapshots.c.end_value, growth.label('growth'),
+                         func.rank().over(order_by=growth.desc()).label('rank'))
+                  .where(snapshots.c.create_dt == end_dt, growth.isnot(None))
+                  .subquery())
+        return self._execute(select(ranked).where(ranked.c.rank <= n).order_by(ranked.c.rank, ranked.c.path))
+
+    def growth_rates(self,start_dt,end_dt,metric='length',path_prefix=None,limit=None):
+        """
+        Return the growth of each path from its first to its last snapshot between two dates
+        :param start_dt: first snapshot date to include
+        :param end_dt: last snapshot date to include
+        :param metric: length, space_consumed_bytes, file_count or directory_count
+        :param path_prefix: only include paths under this directory
+        :param limit: maximum number of paths
+        :return: list of dictionary with path, first_dt, last_dt, start_value, end_value, growth and growth_per_day
+                 ordered by growth_per_day descending - growth_per_day is None for paths with one snapshot
+        """
+        table = self.db_table_class.__table__
+        value = self._metric_column(metric)
+        create_dt = table.c.create_dt
+        oldest = {'partition_by': table.c.path, 'order_by': table.c.create_dt}
+        newest = {'partition_by': table.c.path, 'order_by': table.c.create_dt.desc()}
+        snapshots = (select(table.c.path,
+                            func.first_value(create_dt, type_=create_dt.type).over(**oldest).label('first_dt'),
+                            func.first_value(create_dt, type_=create_dt.type).over(**newest).label('last_dt'),
+                            func.first_value(value, type_=value.type).over(**oldest).label('start_value'),
+                            func.first_value(value, type_=value.type).over(**newest).label('end_value'),
+                            func.row_number().over(**newest).label('snapshot_number'))
+                     .where(table.c.create_dt >= start_dt, table.c.create_dt <= end_dt,
+                            *self._path_clauses(path_prefix))
+                     .subquery())
+        growth = snapshots.c.end_value - snapshots.c.start_value
+        growth_per_day = cast(growth, Float) / func.nullif(self._days_between(snapshots.c.first_dt,
+                                                                              snapshots.c.last_dt), 0)
+        query = (select(snapshots.c.path, snapshots.c.first_dt, snapshots.c.last_dt, snapshots.c.start_value,
+                        snapshots.c.end_value, growth.label('growth'), growth_per_day.label('growth_per_day'))
+                 .where(snapshots.c.snapshot_number == 1)
+                 .order_by(func.coalesce(growth_per_day, 0).desc(), snapshots.c.path)
+                 .limit(limit))
+        return self._execute(query)
+
+    def quota_utilization(self,create_dt,min_utilization=None,n=None,path_prefix=None):
+        """
+        Return the share of the space and name quotas used by the paths with a quota in a snapshot
+        :param create_dt: snapshot date
+        :param min_utilization: only include paths using at least this fraction (0.9 = 90%) of either quota
+        :param n: maximum number of paths
+        :param path_prefix: only include paths under this directory
+        :return: list of dictionary with path, space_consumed_bytes, space_quota_bytes, space_utilization,
+                 names_used, name_quota, name_utilization and rank ordered by the larger utilization descending
+        """
+        table = self.db_table_class.__table__
+        names_used = table.c.file_count + table.c.directory_count
+        space_utilization = cast(table.c.space_consumed_bytes, Float) / func.nullif(table.c.space_quota_bytes, 0)
+        name_utilization = cast(names_used, Float) / func.nullif(table.c.name_quota, 0)
+        utilization = (select(table.c.path, table.c.space_consumed_bytes, table.c.space_quota_bytes,
+                              space_utilization.label('space_utilization'), names_used.label('names_used'),
+                              table.c.name_quota, name_utilization.label('name_utilization'))
+                       .where(table.c.create_dt == create_dt,
+                              or_(table.c.space_quota_bytes.isnot(None), table.c.name_quota.isnot(None)),
+                              *self._path_clauses(path_prefix))
+                       .subquery())
+        # the larger of the two utilizations, treating a missing quota as unused
+        space = func.coalesce(utilization.c.space_utilization, 0)
+        name = func.coalesce(utilization.c.name_utilization, 0)
+        highest = func.max(space, name) if get_engine().dialect.name == 'sqlite' else func.greatest(space, name)
+        query = (select(utilization, func.rank().over(order_by=highest.desc()).label('rank'))
+                 .order_by(highest.desc(), utilization.c.path)
+                 .limit(n))
+        if min_utilization is not None:
+            query = query.where(highest >= min_utilization)
+        return self._execute(query)
+
+    def _metric_column(self,metric):
+        if metric not in growth_metrics:
+            raise ValueError("Unknown metric {0} - expected one of {1}".format(metric, ', '.join(growth_metrics)))
+        return self.db_table_class.__table__.c[metric]
+
+    def _path_clauses(self,path_prefix):
+        if not path_prefix:
+            return []
+        path = self.db_table_class.__table__.c.path
+        path_prefix = path_prefix.rstrip('/')
+        return [or_(path == path_prefix, self._subpath_clause(path, path_prefix))]
+
+    @staticmethod
+    def _subpath_clause(column,path):
+        """
+        LIKE 'path/%' with the pattern built here rather than in SQL so it can use the path prefix index
+        """
+        pattern = path.rstrip('/').replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%'
+        return column.like(pattern, escape='\\')
+
+    @staticmethod
+    def _days_between(start, end):
+        if get_engine().dialect.name == 'sqlite':
+            return func.julianday(end) - func.julianday(start)
+        return end - start
+
+    @session_method
+    def _execute(self,query):
+        self.get_session()
+        result = [dict(row._mapping) for row in self.session.execute(query)]
+        self.close_session()
+        return result
+
+    def subtree_usage(self,path,create_dt,depth=1):
+        """
+        Return the usage of the directories under a path in a snapshot
+        :param path: directory
+        :param create_dt: snapshot date
+        :param depth: levels below path to include - 1 returns the children of path
+        :return: list of dictionary with path, path_depth, directory_count, file_count, length and
+                 space_consumed_bytes ordered by length descending
+        """
+        table = self.db_table_class.__table__
+        path_depth, _ = path_hierarchy(path)
+        path = path.rstrip('/') or '/'
+        if depth == 1:
+            clauses = [table.c.parent_path == path]
+        else:
+            clauses = [self._subpath_clause(table.c.path, path) if path != '/' else table.c.path_depth > 0,
+                       table.c.path_depth <= path_depth + depth]
+        query = (select(table.c.path, table.c.path_depth, table.c.directory_count, table.c.file_count,
+                        table.c.length, table.c.space_consumed_bytes)
+                 .where(table.c.create_dt == create_dt, *clauses)
+                 .order_by(table.c.length.desc(), table.c.path))
+        return self._execute(query)
+
+    def usage_trend(self,path,period='month',start_dt=None,end_dt=None,children=False):
+        """
+        Return the rollups of a path, or of its children, per week or month
+        :param path: directory
+        :param period: week or month
+        :param start_dt: first period to include - defaults to all
+        :param end_dt: last period to include - defaults to all
+        :param children: return the rollups of the children of path instead of path
+        :return: list of dictionary of HdfsDiskUsageRollup columns ordered by path and period_start_dt
+        """
+        if period not in rollup_periods:
+            raise ValueError("Unknown period {0} - expected one of {1}".format(period, ', '.join(rollup_periods)))
+        path = path.rstrip('/') or '/'
+        filters = {'period': period, 'parent_path' if children else 'path': path}
+        if start_dt is not None:
+            filters['period_start_dt__gte'] = period_range(period, start_dt)[0]
+        if end_dt is not None:
+            filters['period_start_dt__lte'] = end_dt
+        return HdfsDiskUsageRollupOperator().select_rows(order_by=['path', 'period_start_dt'], **filters)
+
+    def refresh_rollups(self,create_dt):
+        """
+        Recompute the week and month rollups containing a snapshot date from the daily rows
+        :param create_dt: snapshot date
+        :return:
+        """
+        with get_engine().begin() as connection:
+            self._refresh_rollups(connection, create_dt)
+
+    def rebuild_rollups(self,start_dt=None,end_dt=None):
+        """
+        Recompute the rollups of every period with snapshots between two dates, one period per transaction
+        :param start_dt: first snapshot date - defaults to the earliest
+        :param end_dt: last snapshot date - defaults to the latest
+        :return: number of periods refreshed
+        """
+        table = self.db_table_class.__table__
+        query = select(table.c.create_dt).distinct().order_by(table.c.create_dt)
+        if start_dt is not None:
+            query = query.where(table.c.create_dt >= start_dt)
+        if end_dt is not None:
+            query = query.where(table.c.create_dt <= end_dt)
+        engine = get_engine()
+        with engine.connect() as connection:
+            snapshot_dates = [row.create_dt for row in connection.execute(query)]
+        periods = set()
+        for snapshot_date in snapshot_dates:
+            for period in rollup_periods:
+                periods.add((period, period_range(period, snapshot_date)))
+        for period, (start, end) in sorted(periods):
+            with engine.begin() as connection:
+                self._refresh_rollup(connection, period, start, end)
+        return len(periods)
+
+    def _refresh_rollups(self,connection,create_dt,incremental=False):
+        for period in rollup_periods:
+            start, end = period_range(period, create_dt)
+            if incremental and connection.dialect.name in ('postgresql', 'sqlite'):
+                self._add_to_rollup(connection, period, start, create_dt)
+            else:
+                self._refresh_rollup(connection, period, start, end)
+
+    def _add_to_rollup(self,connection,period,start,create_dt):
+        """
+        Add the rows of one newly loaded day to the rollup of a period with INSERT ... ON CONFLICT DO UPDATE.  The
+        running length_sum and snapshot_count give avg_length, and the counts and sizes are replaced only when
+        the day is not older than the latest snapshot already in the rollup.
+        """
+        table = self.db_table_class.__table__
+        rollup = HdfsDiskUsageRollup.__table__
+        columns = ['period', 'period_start_dt', 'path', 'path_depth', 'parent_path', 'snapshot_count', 'last_dt',
+                   'directory_count', 'file_count', 'length', 'space_consumed_bytes', 'max_length', 'length_sum',
+                   'avg_length', 'created_dttm']
+        query = (select(literal(period), literal(start, rollup.c.period_start_dt.type), table.c.path,
+                        table.c.path_depth, table.c.parent_path, literal(1), table.c.create_dt,
+                        table.c.directory_count, table.c.file_count, table.c.length, table.c.space_consumed_bytes,
+                        table.c.length, table.c.length, table.c.length,
+                        literal(datetime.now(), rollup.c.created_dttm.type))
+                 .where(table.c.create_dt == create_dt))
+        dialect = postgresql if connection.dialect.name == 'postgresql' else sqlite
+        statement = dialect.insert(rollup).from_select(columns, query)
+        new = statement.excluded
+        newer = new.last_dt >= rollup.c.last_dt
+        length_sum = func.coalesce(rollup.c.length_sum, 0) + func.coalesce(new.length, 0)
+        snapshot_count = rollup.c.snapshot_count + 1
+        greatest = func.greatest if connection.dialect.name == 'postgresql' else func.max
+        max_length = greatest(func.coalesce(rollup.c.max_length, new.length),
+                              func.coalesce(new.length, rollup.c.max_length))
+        values = {'snapshot_count': snapshot_count,
+                  'length_sum': length_sum,
+                  'avg_length': length_sum / snapshot_count,
+                  'max_length': max_length}
+        for name in ('last_dt', 'path_depth', 'parent_path', 'directory_count', 'file_count', 'length',
+                     'space_consumed_bytes'):
+            values[name] = case((newer, new[name]), else_=rollup.c[name])
+        connection.execute(statement.on_conflict_do_update(
+            index_elements=['period', 'path', 'period_start_dt'], set_=values))
+
+    def _refresh_rollup(self,connection,period,start,end):
+        """
+        Replace the rollup of one period with the aggregates of its daily rows - the latest snapshot of each path
+        supplies the counts and sizes
+        """
+        table = self.db_table_class.__table__
+        rollup = HdfsDiskUsageRollup.__table__
+        by_path = {'partition_by': table.c.path}
+        latest = {'partition_by': table.c.path, 'order_by': table.c.create_dt.desc()}
+        snapshots = (select(table.c.path, table.c.path_depth, table.c.parent_path, table.c.create_dt,
+                            table.c.directory_count, table.c.file_count, table.c.length,
+                            table.c.space_consumed_bytes,
+                            func.count().over(**by_path).label('snapshot_count'),
+                            func.max(table.c.length).over(**by_path).label('max_length'),
+                            func.sum(table.c.length).over(**by_path).label('length_sum'),
+                            func.row_number().over(**latest).label('snapshot_number'))
+                     .where(table.c.create_dt >= start, table.c.create_dt < end)
+                     .subquery())
+        columns = ['period', 'period_start_dt', 'path', 'path_depth', 'parent_path', 'snapshot_count', 'last_dt',
+                   'directory_count', 'file_count', 'length', 'space_consumed_bytes', 'max_length', 'length_sum',
+                   'avg_length', 'created_dttm']
+        query = (select(literal(period), literal(start, rollup.c.period_start_dt.type), snapshots.c.path,
+                        snapshots.c.path_depth, snapshots.c.parent_path, snapshots.c.snapshot_count,
+                        snapshots.c.create_dt, snapshots.c.directory_count, snapshots.c.file_count,
+                        snapshots.c.length, snapshots.c.space_consumed_bytes, snapshots.c.max_length,
+                        snapshots.c.length_sum, snapshots.c.length_sum / snapshots.c.snapshot_count,
+                        literal(datetime.now(), rollup.c.created_dttm.type))
+                 .where(snapshots.c.snapshot_number == 1))
+        connection.execute(delete(rollup).where(rollup.c.period == period, rollup.c.period_start_dt == start))
+        connection.execute(insert(rollup).from_select(columns, query))
+
+
+class HdfsDiskUsageRollupOperator(BaseOperator):
+    """ Operations on the HDFS Disk Usage Rollup table"""
+    db_table_class = HdfsDiskUsageRollup
@@ -11,17 +11,28 @@ Version History:
     Removed ImportStageLogOperator.get_new_stage_loads - no longer needed
 0.3.2 jwd3 02/06/2017
     Changed StatusTableOperator to LogTableOperator
+0.4 agent 10/18/2026
+    ImportDefinitionOperator is a DefinitionTableOperator so its reads can be cached
+0.5 agent 10/18/2026
+    Added ImportFileDownloadLogOperator.get_pending_file_downloads using a NOT EXISTS anti-join to the stage log
+    get_new_file_downloads uses the same anti-join for any source group instead of EXCEPT on unrelated ids
+0.5.1 agent 10/18/2026
+    Methods which open a session discard it when they raise
+0.5.2 agent 10/18/2026
+    get_pending_file_downloads raises ValueError for a limit below 1 and shares the keyset query of page
 """
+from sqlalchemy import select, and_, exists
+
 from repository.metadata.models import ImportDefinition, ImportFileDownloadLog, ImportStageLog, ImportODSLog
-from repository.operators.base_operator import BaseOperator, LogTableOperator
+from repository.operators.base_operator import DefinitionTableOperator, LogTableOperator, session_method
 
-__version__ = "0.3.2"
+__version__ = "0.5.2"
 __date__ = '01/24/2017'
-__updated__ = '02/06/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
 
-class ImportDefinitionOperator(BaseOperator):
+class ImportDefinitionOperator(DefinitionTableOperator):
     """
     Defines methods and attributes for database operations on the ImportDefinition table
     """
@@ -46,21 +57,53 @@ class ImportFileDownloadLogOperator(LogTableOperator):
     """
     db_table_class = ImportFileDownloadLog
 
-    def get_new_file_downloads(self,**kwargs):
-        if not self.session:
-            self.get_session()
-
-        stage_ids = (self.session.query(ImportStageLog.id).join(ImportDefinition)
-                      .filter(ImportStageLog.status == 'complete',
-                              ImportDefinition.source_group_name == 'doubleclick'))
-        new_file_download_ids = (self.session.query(ImportFileDownloadLog.id).join(ImportDefinition)
-                                  .filter(ImportFileDownloadLog.status == 'complete',
-                                          ImportDefinition.source_group_name == 'doubleclick')
-                                  .except_(stage_ids))
-        new_file_download_id_records = new_file_download_ids.all()
-        new_file_download_records = (self.session.query(ImportFileDownloadLog)
-              .filter(ImportFileDownloadLog.id.in_([x[0] for x in new_file_download_id_records])))
-        return new_file_download_records.all()
+    @session_method
+    def get_new_file_downloads(self,source_group_name='doubleclick',**kwargs):
+        """
+        Return the completed file downloads of a source group which have no completed stage load
+        :param source_group_name: name of the source group
+        :return: list of ImportFileDownloadLog instances
+        """
+        self.get_session()
+        return (self.session.query(ImportFileDownloadLog)
+                .filter(*self.pending_download_clauses(source_group_name))
+                .order_by(ImportFileDownloadLog.id)
+                .all())
+
+    @session_method
+    def get_pending_file_downloads(self,source_group_name=None,status='complete',stage_status='complete',
+                                   after_id=None,limit=1000,cursor=None):
+        """
+        Return one page of file downloads which have no matching stage load.  A stage load matches when it has
+        the same source_id and run_id and its realized_source_name is the filename of the download.
+        :param source_group_name: name of the source group - defaults to all source groups
+        :param status: status of the file downloads
+        :param stage_status: status of the matching stage loads - None for any status
+        :param after_id: return file downloads with an id greater than this value
+        :param limit: maximum number of file downloads in the page - at least 1
+        :param cursor: next_cursor token from the previous page - used instead of after_id
+        :return: dictionary with the list of file downloads and the next_cursor token (None on the last page)
+        """
+        table = self.db_table_class.__table__
+        query = select(table).where(*self.pending_download_clauses(source_group_name, status, stage_status))
+        return self._page(query, after_id, limit, cursor)
+
+    @staticmethod
+    def pending_download_clauses(source_group_name=None,status='complete',stage_status='complete'):
+        """
+        Build the where clauses selecting file downloads without a stage load (NOT EXISTS anti-join)
+        :return: list of sqlalchemy clauses
+        """
+        stage_load = and_(ImportStageLog.source_id == ImportFileDownloadLog.source_id,
+                          ImportStageLog.run_id == ImportFileDownloadLog.run_id,
+                          ImportStageLog.realized_source_name == ImportFileDownloadLog.filename)
+        if stage_status is not None:
+            stage_load = and_(stage_load, ImportStageLog.status == stage_status)
+        clauses = [ImportFileDownloadLog.status == status, ~exists().where(stage_load)]
+        if source_group_name is not None:
+            clauses.append(ImportFileDownloadLog.source_id.in_(
+                select(ImportDefinition.id).where(ImportDefinition.source_group_name == source_group_name)))
+        return clauses
 
 
 class ImportStageLogOperator(LogTableOperator):
@@ -0,0 +1,21 @@
+"""
+repository.operators.valid_value_operator - Operators for database actions on the Valid Value table
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+"""
+from repository.operators.base_operator import DefinitionTableOperator
+from repository.metadata.models import ValidValue
+
+__version__ = "0.1"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = []
+
+
+class ValidValueOperator(DefinitionTableOperator):
+    """
+    Defines methods and attributes for database operations on the Valid Value table
+    """
+    db_table_class = ValidValue
@@ -4,24 +4,79 @@ repository.operators.workflow_operators - Database operations for workflow relat
 Version History:
 0.1.1 jwd3 02/06/2017
     Updated get_parameter_value to use _select so connections are closed
+0.2 agent 10/18/2026
+    Added get_workflow_parameters to load all parameters of a workflow in one query
+    Unpickled parameter values are memoized by id and modified_dttm
+    WorkflowConfigOperator is a DefinitionTableOperator so its reads can be cached
+0.2.1 agent 10/18/2026
+    Methods which open a session discard it when they raise
+0.2.2 agent 10/18/2026
+    get_workflow_parameters returns copies of the memoized values so callers can not change later results
+    The unpickled values are memoized per workflow so values of deleted parameters are dropped
 """
+import copy
 import os
 import sys
 
-from repository.operators.base_operator import BaseOperator
+from repository.operators.base_operator import DefinitionTableOperator, session_method
 from repository.metadata.models import WorkflowConfig
-from sqlalchemy import and_
+from sqlalchemy import and_, select, type_coerce, LargeBinary
 
-__version__ = "0.1.1"
+__version__ = "0.2.2"
 __date__ = '1/24/2017'
-__updated__ = '02/06/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
 
-class WorkflowConfigOperator(BaseOperator):
+class WorkflowConfigOperator(DefinitionTableOperator):
     """ Operations on the Workflow Config table"""
     db_table_class = WorkflowConfig
-    
+    # workflow name -> id -> (modified_dttm, unpickled parameter value) shared by all instances
+    parameter_values = {}
+
     def get_parameter_value(self,workflow_name,parameter_name):
         result = self.select_one(workflow_name=workflow_name,parameter_name=parameter_name)
         return result.get('parameter_value')
+
+    @session_method
+    def get_workflow_parameters(self,workflow_name):
+        """
+        Return all parameters of a workflow using one query.  A parameter value is only unpickled when its
+        id or modified_dttm has changed since it was last read in this process, and the query is skipped
+        altogether while the result is fresh in the cache (see enable_cache).  Each call returns its own copy
+        of the values.
+        :param workflow_name: name of the workflow
+        :return: dictionary of parameter name and value
+        """
+        key = ('workflow_parameters', workflow_name)
+        if self.cache is not None:
+            entry = self.cache.get(key)
+            if entry is not None and not entry[2]:
+                return copy.deepcopy(entry[0])
+        table = self.db_table_class.__table__
+        # select the pickled bytes so only new or changed values are unpickled
+        query = (select(table.c.id, table.c.modified_dttm, table.c.parameter_name,
+                        type_coerce(table.c.parameter_value, LargeBinary).label('pickled_value'))
+                 .where(table.c.workflow_name == workflow_name))
+        self.get_session()
+        rows = self.session.execute(query).fetchall()
+        self.close_session()
+        pickler = table.c.parameter_value.type.pickler
+        memos = self.parameter_values.get(workflow_name, {})
+        # only the parameters still in the table are kept
+        current = {}
+        parameters = {}
+        for row in rows:
+            memo = memos.get(row.id)
+            if memo is None or memo[0] != row.modified_dttm:
+                value = pickler.loads(row.pickled_value) if row.pickled_value is not None else None
+                memo = (row.modified_dttm, value)
+            current[row.id] = memo
+            parameters[row.parameter_name] = memo[1]
+        if current:
+            self.parameter_values[workflow_name] = current
+        else:
+            self.parameter_values.pop(workflow_name, None)
+        if self.cache is not None:
+            self.cache.put(key, parameters)
+        return copy.deepcopy(parameters)
@@ -0,0 +1,100 @@
+"""
+repository.utils.cache - LRU cache with time to live used for caching definition table reads
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+"""
+import threading
+import time
+from collections import OrderedDict
+
+__version__ = "0.1"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = ['RecordCache']
+
+
+class RecordCache(object):
+    """
+    Thread safe least recently used cache whose entries expire after ttl seconds.  An expired entry is kept
+    with its signature so the caller can revalidate it against the database instead of reloading it.
+    """
+    def __init__(self,max_size=256,ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(*args,**kwargs):
+        """
+        Build a hashable key from the arguments of a read
+        :return: key or None if an argument can not be hashed
+        """
+        key = args + tuple(sorted((name, tuple(value) if isinstance(value, (list, set)) else value)
+                                  for name, value in kwargs.items()))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self,key):
+        """
+        Look up an entry
+        :param key: cache key
+        :return: tuple of value, signature and expired flag or None if the key is not cached
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = entry  # move to the most recently used end
+            value, signature, expires = entry
+            expired = time.time() >= expires
+            if expired:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return value, signature, expired
+
+    def put(self,key,value,signature=None):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, signature, time.time() + self.ttl)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def renew(self,key):
+        """
+        Reset the expiry of an entry which was revalidated as unchanged
+        :param key: cache key
+        :return:
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, signature, _ = entry
+                self._entries[key] = (value, signature, time.time() + self.ttl)
+                self.revalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'revalidations': self.revalidations,
+                    'evictions': self.evictions,
+                    'size': len(self._entries),
+                    'max_size': self.max_size,
+                    'ttl': self.ttl}
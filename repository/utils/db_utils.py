@@ -2,18 +2,25 @@
 <PATH> utils - <DESCRIPTION>
 
 Version History:
-
+0.2 agent 10/18/2026
+    Added copy_text and copy_rows to write rows with COPY ... FROM STDIN in the text format
 """
 import os
+from datetime import date, datetime
+try:
+    from cStringIO import StringIO
+except ImportError:
+    from io import StringIO
+
 from alembic.config import Config
 from alembic import command
 
 from repository.metadata.models import ModelBase
-from repository.connection import repo_engine
+from repository.connection import get_engine
 
-__version__ = "0.1"
+__version__ = "0.2"
 __date__ = '2/12/2017'
-__updated__ = '2/12/2017'
+__updated__ = '10/18/2026'
 __all__ = []
 
 
@@ -22,6 +29,49 @@ def initdb():
     Build a repository from scratch
     :return:
     """
-    ModelBase.metadata.create_all(bind=repo_engine)
+    ModelBase.metadata.create_all(bind=get_engine())
     alembic_cfg = Config(os.path.join(os.getenv("VIRTUAL_ENV",os.getcwd()),"migrations/alembic.ini"))
     command.stamp(alembic_cfg, "head")
+
+
+def copy_text(rows,columns,encoders=None):
+    """
+    Format rows in the text format of COPY ... FROM STDIN - tab separated with \\N for NULL
+    :param rows: iterable of dictionaries of columns and values - missing columns are NULL
+    :param columns: column names in the order of the COPY column list
+    :param encoders: dictionary of column name and function converting a value to text, i.e. json.dumps
+    :return: string with one line per row
+    """
+    encoders = encoders or {}
+    lines = []
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            if value is None:
+                values.append('\\N')
+                continue
+            if column in encoders:
+                value = encoders[column](value)
+            elif isinstance(value, datetime):
+                value = value.isoformat(' ')
+            elif isinstance(value, date):
+                value = value.isoformat()
+            value = str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+            values.append(value)
+        lines.append('\t'.join(values))
+    return '\n'.join(lines) + '\n'
+
+
+def copy_rows(cursor,table_name,columns,rows,encoders=None):
+    """
+    Write rows to a table with COPY ... FROM STDIN on a psycopg2 cursor
+    :param cursor: psycopg2 cursor of the transaction to write in
+    :param table_name: name of the table
+    :param columns: column names to write
+    :param rows: iterable of dictionaries of columns and values
+    :param encoders: dictionary of column name and function converting a value to text
+    :return:
+    """
+    sql = 'COPY {0} ({1}) FROM STDIN'.format(table_name, ', '.join(columns))
+    cursor.copy_expert(sql, StringIO(copy_text(rows, columns, encoders)))
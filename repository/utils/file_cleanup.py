@@ -0,0 +1,255 @@
+"""
+repository.utils.file_cleanup - Apply the FileCleanup rules to local filesystems
+
+Directories are scanned in parallel with os.scandir and every file is looked up in the compiled rules.  Files
+past the retention_period of their rule are deleted (cleanup_action D) or moved to the archive_path
+(cleanup_action A) by a separate, smaller pool of threads so the disks are not flooded with requests.
+
+Archived files go to archive_path, under the file's directory relative to the rule path when subdir_append_flg
+is set and under a YYYYMMDD directory of the run date when date_append_flg is set.  An archived file never
+replaces a file already in the archive - it gets a .1, .2, ... suffix before its extension instead.  Rules with
+an HDFS archive path are not applied.  Each file acted on (or planned in a dry run) is logged to the Event table in batches.
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+0.1.1 agent 10/18/2026
+    Archiving does not overwrite an existing file in the archive path
+"""
+import errno
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+try:
+    from os import scandir
+except ImportError:
+    from scandir import scandir  # backport for python < 3.5
+
+from repository.operators import FileCleanupOperator, EventWriter
+
+__version__ = "0.1.1"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = ['FileCleanupExecutor']
+
+logger = logging.getLogger(__name__)
+
+cleanup_actions = {'D': 'delete', 'A': 'archive'}
+event_category = 'file_cleanup'
+
+
+class FileCleanupExecutor(object):
+    """
+    Scans the local paths of the active FileCleanup rules and deletes or archives the expired files::
+
+        executor = FileCleanupExecutor(scan_workers=16, io_workers=4)
+        executor.plan()  # list of the actions a run would take
+        executor.run(dry_run=True)  # log the planned actions to the Event table without changing any file
+        executor.run()  # {'deleted': 120, 'archived': 30, 'failed': 0, 'skipped': 2, 'bytes': 73400320, ...}
+    """
+    def __init__(self,matcher=None,scan_workers=8,io_workers=4,event_batch_size=500,glob=False):
+        """
+        :param matcher: FileCleanupRuleMatcher - defaults to the active local rules
+        :param scan_workers: threads scanning directories
+        :param io_workers: threads deleting and archiving files - the number of file operations in flight
+        :param event_batch_size: events inserted per batch
+        :param glob: filename_pattern is a shell wildcard pattern instead of a regular expression
+        """
+        self.matcher = matcher or FileCleanupOperator().compile_rules(hdfs=False, glob=glob)
+        self.scan_workers = scan_workers
+        self.io_workers = io_workers
+        self.event_batch_size = event_batch_size
+        self.scan_errors = []
+        self.now = None
+
+    def scan(self,now=None):
+        """
+        Generate the files past the retention_period of their rule as the directories are scanned
+        :param now: seconds since the epoch the file ages are measured from - defaults to now
+        :return: generator of dictionary with path, rule_id, action, size, mtime and target (archive path or None)
+                 and error when the action can not be taken
+        """
+        self.now = now if now is not None else time.time()
+        self.scan_errors = []
+        pool = ThreadPoolExecutor(max_workers=self.scan_workers)
+        try:
+            pending = set(pool.submit(self._scan_directory, path) for path in self.matcher.root_paths())
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    candidates, subdirectories = future.result()
+                    pending.update(pool.submit(self._scan_directory, path) for path in subdirectories)
+                    for candidate in candidates:
+                        yield candidate
+        finally:
+            pool.shutdown(wait=True)
+
+    def plan(self,now=None):
+        """
+        Return the actions a run would take without changing any file or logging any event
+        :param now: seconds since the epoch the file ages are measured from - defaults to now
+        :return: list of dictionary as generated by scan
+        """
+        return list(self.scan(now))
+
+    def run(self,dry_run=False,now=None,event_writer=None):
+        """
+        Delete and archive the expired files, logging each one to the Event table
+        :param dry_run: only log the planned actions
+        :param now: seconds since the epoch the file ages are measured from - defaults to now
+        :param event_writer: EventWriter to log to - defaults to a writer closed when the run ends
+        :return: dictionary with the number of files deleted, archived, planned, failed and skipped, the bytes
+                 removed from the scanned paths and the number of directories which could not be scanned
+        """
+        summary = dict((status, 0) for status in ('deleted', 'archived', 'planned', 'failed', 'skipped'))
+        summary['bytes'] = 0
+        writer = event_writer or EventWriter(flush_size=self.event_batch_size)
+        pool = ThreadPoolExecutor(max_workers=self.io_workers)
+        try:
+            pending = set()
+            for candidate in self.scan(now):
+                if dry_run or candidate.get('error'):
+                    self._record(writer, summary, candidate, 'skipped' if candidate.get('error') else 'planned')
+                    continue
+                # bound the queued file operations so a large scan does not pile up in memory
+                if len(pending) >= self.io_workers * 4:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    self._record_results(writer, summary, done)
+                pending.add(pool.submit(self._apply, candidate))
+            self._record_results(writer, summary, pending)
+        finally:
+            pool.shutdown(wait=True)
+            summary['scan_errors'] = len(self.scan_errors)
+            writer.write(event_category=event_category, event_type='summary', event_action='dry_run' if dry_run
+                         else 'run', event_name='file cleanup', event_payload=summary)
+            if event_writer is None:
+                writer.close()
+        return summary
+
+    def archive_target(self,path,rule):
+        """
+        Return the path a file is archived to
+        :param path: full path of the file
+        :param rule: rule dictionary
+        :return: archive path of the file
+        """
+        directory = rule['archive_path']
+        if rule.get('subdir_append_flg'):
+            relative = os.path.relpath(os.path.dirname(path), rule['path'])
+            if relative != os.curdir:
+                directory = os.path.join(directory, relative)
+        if rule.get('date_append_flg'):
+            directory = os.path.join(directory, datetime.fromtimestamp(self.now or time.time()).strftime('%Y%m%d'))
+        return os.path.join(directory, os.path.basename(path))
+
+    def _scan_directory(self,path):
+        candidates = []
+        subdirectories = []
+        try:
+            for entry in scandir(path):
+                if entry.is_dir(follow_symlinks=False):
+                    if self.matcher.descends_into(entry.path):
+                        subdirectories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    rule = self.matcher.match(entry.path)
+                    if rule is None or not rule.get('cleanup_action'):
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                    if self.matcher.is_expired(rule, stat.st_mtime, self.now):
+                        candidates.append(self._candidate(entry.path, rule, stat))
+        except OSError as e:
+            # a missing rule path is not an error - the directory may not have been created yet
+            if e.errno != errno.ENOENT:
+                logger.warning("Unable to scan %s: %s", path, e)
+                self.scan_errors.append((path, str(e)))
+        return candidates, subdirectories
+
+    def _candidate(self,path,rule,stat):
+        candidate = {'path': path,
+                     'rule_id': rule['rule_id'],
+                     'action': cleanup_actions.get(rule['cleanup_action'].upper()),
+                     'size': stat.st_size,
+                     'mtime': datetime.fromtimestamp(stat.st_mtime),
+                     'target': None}
+        if candidate['action'] is None:
+            candidate['error'] = "Unknown cleanup_action {0}".format(rule['cleanup_action'])
+        elif candidate['action'] == 'archive':
+            if not rule.get('archive_path'):
+                candidate['error'] = "Rule has no archive_path"
+            elif rule.get('hdfs_archive_path_flg'):
+                candidate['error'] = "Archiving to HDFS is not supported"
+            else:
+                candidate['target'] = self.archive_target(path, rule)
+        return candidate
+
+    @staticmethod
+    def _apply(candidate):
+        try:
+            if candidate['action'] == 'delete':
+                os.remove(candidate['path'])
+                return candidate, 'deleted'
+            try:
+                os.makedirs(os.path.dirname(candidate['target']))
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            candidate['target'] = FileCleanupExecutor._reserve_target(candidate['target'])
+            try:
+                shutil.move(candidate['path'], candidate['target'])
+            except (OSError, IOError):
+                FileCleanupExecutor._remove_quietly(candidate['target'])
+                raise
+            return candidate, 'archived'
+        except (OSError, IOError) as e:
+            candidate['error'] = str(e)
+            return candidate, 'failed'
+
+    @staticmethod
+    def _reserve_target(target):
+        """
+        Create an empty file at the first free name for an archive target so no other file is moved onto it
+        :param target: archive path of the file
+        :return: reserved path - target or target with a numbered suffix before the extension
+        """
+        root, extension = os.path.splitext(target)
+        path = target
+        number = 0
+        while True:
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+            number += 1
+            path = '{0}.{1}{2}'.format(root, number, extension)
+
+    @staticmethod
+    def _remove_quietly(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _record_results(self,writer,summary,futures):
+        for future in futures:
+            candidate, status = future.result()
+            self._record(writer, summary, candidate, status)
+
+    @staticmethod
+    def _record(writer,summary,candidate,status):
+        summary[status] += 1
+        if status in ('deleted', 'archived'):
+            summary['bytes'] += candidate['size']
+        elif status == 'failed':
+            logger.warning("Unable to %s %s: %s", candidate['action'], candidate['path'], candidate['error'])
+        payload = {'size': candidate['size'],
+                   'mtime': candidate['mtime'].isoformat(),
+                   'target': candidate['target'],
+                   'error': candidate.get('error')}
+        writer.write(event_category=event_category, event_group=str(candidate['rule_id']),
+                     event_type=candidate['action'], event_subtype=status, event_name=candidate['path'],
+                     event_action='file', event_payload=payload)
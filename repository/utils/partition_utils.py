@@ -0,0 +1,183 @@
+"""
+repository.utils.partition_utils - Management of monthly range partitions on PostgreSQL
+
+Partitions are named <table>_pYYYYMM and hold the rows from the first day of that month up to the first day
+of the next month.  A <table>_pdefault partition holds rows outside every monthly partition.
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+0.2 agent 10/18/2026
+    create_partitions moves the rows of a new month out of the default partition instead of failing
+    partition_table rejects a table with null values in the partition column before changing anything
+"""
+from datetime import date, datetime
+
+from sqlalchemy import text
+
+__version__ = "0.2"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = ['is_partitioned', 'list_partitions', 'create_partitions', 'drop_partitions', 'partition_table']
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def next_month(value):
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def month_ranges(start, end):
+    """
+    Return the (first day, first day of next month) of every month from start up to end
+    :param start: date or datetime
+    :param end: date or datetime - the month of end is included
+    :return: list of tuples
+    """
+    ranges = []
+    month = month_start(start)
+    while month <= month_start(end):
+        ranges.append((month, next_month(month)))
+        month = next_month(month)
+    return ranges
+
+
+def partition_name(table_name, month):
+    return '{0}_p{1:%Y%m}'.format(table_name, month)
+
+
+def is_partitioned(connection, table_name):
+    """
+    Check if a table is a partitioned table
+    :param connection: sqlalchemy connection
+    :param table_name: name of the table
+    :return: True or False - always False on databases other than PostgreSQL
+    """
+    if connection.dialect.name != 'postgresql':
+        return False
+    return connection.execute(text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt "
+                                   "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = :table_name)"),
+                              {'table_name': table_name}).scalar()
+
+
+def list_partitions(connection, table_name):
+    """
+    Return the monthly partitions of a table
+    :param connection: sqlalchemy connection
+    :param table_name: name of the partitioned table
+    :return: list of (partition name, first day of month) ordered by month
+    """
+    rows = connection.execute(text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+                                   "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table_name"),
+                              {'table_name': table_name})
+    prefix = table_name + '_p'
+    partitions = []
+    for (name,) in rows:
+        suffix = name[len(prefix):]
+        if name.startswith(prefix) and suffix.isdigit():
+            partitions.append((name, datetime.strptime(suffix, '%Y%m').date()))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def partition_column(connection, table_name):
+    """
+    Return the column a table is range partitioned on
+    :param connection: sqlalchemy connection to PostgreSQL
+    :param table_name: name of the partitioned table
+    :return: column name
+    """
+    definition = connection.execute(text("SELECT pg_get_partkeydef(CAST(:table_name AS regclass))"),
+                                    {'table_name': table_name}).scalar()
+    return definition[definition.index('(') + 1:definition.rindex(')')].strip().strip('"')
+
+
+def create_partitions(connection, table_name, start, end):
+    """
+    Create the missing monthly partitions from the month of start to the month of end.  PostgreSQL can not add a
+    partition while the default partition holds rows for it, so when it does the default partition is detached,
+    its rows for the month are moved into the new partition and it is attached again.  Run inside a transaction.
+    :param connection: sqlalchemy connection
+    :param table_name: name of the partitioned table
+    :param start: date or datetime
+    :param end: date or datetime
+    :return: list of the names of the partitions created
+    """
+    existing = set(name for name, _ in list_partitions(connection, table_name))
+    default_name = table_name + '_pdefault'
+    has_default = connection.execute(text("SELECT to_regclass(:name)"), {'name': default_name}).scalar() is not None
+    column = partition_column(connection, table_name) if has_default else None
+    created = []
+    for month, upper in month_ranges(start, end):
+        name = partition_name(table_name, month)
+        if name in existing:
+            continue
+        bounds = {'lower': month, 'upper': upper}
+        in_month = "{0} >= :lower AND {0} < :upper".format(column)
+        move_rows = has_default and connection.execute(text("SELECT EXISTS (SELECT 1 FROM {0} WHERE {1})".format(
+            default_name, in_month)), bounds).scalar()
+        if move_rows:
+            connection.execute(text("ALTER TABLE {0} DETACH PARTITION {1}".format(table_name, default_name)))
+        connection.execute(text("CREATE TABLE {0} PARTITION OF {1} FOR VALUES FROM ('{2}') TO ('{3}')".format(
+            name, table_name, month.isoformat(), upper.isoformat())))
+        if move_rows:
+            connection.execute(text("INSERT INTO {0} SELECT * FROM {1} WHERE {2}".format(
+                name, default_name, in_month)), bounds)
+            connection.execute(text("DELETE FROM {0} WHERE {1}".format(default_name, in_month)), bounds)
+            connection.execute(text("ALTER TABLE {0} ATTACH PARTITION {1} DEFAULT".format(table_name, default_name)))
+        created.append(name)
+    return created
+
+
+def drop_partitions(connection, table_name, before):
+    """
+    Drop the monthly partitions holding only rows earlier than before
+    :param connection: sqlalchemy connection
+    :param table_name: name of the partitioned table
+    :param before: date or datetime
+    :return: list of the names of the partitions dropped
+    """
+    if not isinstance(before, datetime):
+        before = datetime.combine(before, datetime.min.time())
+    dropped = []
+    for name, month in list_partitions(connection, table_name):
+        if datetime.combine(next_month(month), datetime.min.time()) <= before:
+            connection.execute(text("DROP TABLE {0}".format(name)))
+            dropped.append(name)
+    return dropped
+
+
+def partition_table(connection, table_name, column, primary_key, end):
+    """
+    Convert a table to a table partitioned by month on column, creating partitions for every month from the
+    earliest row up to end and a default partition for rows outside them.  The primary key of a partitioned
+    table has to include the partition column, so it becomes (primary_key, column) and the column can not hold
+    nulls.  Indexes other than the primary key have to be created again afterwards.  Run inside a transaction.
+    :param connection: sqlalchemy connection to PostgreSQL
+    :param table_name: name of the table
+    :param column: datetime column to partition on
+    :param primary_key: name of the primary key column
+    :param end: date or datetime of the last month to create a partition for
+    :return:
+    """
+    nulls = connection.execute(text("SELECT count(*) FROM {0} WHERE {1} IS NULL".format(table_name, column))).scalar()
+    if nulls:
+        raise ValueError("Cannot partition {0} on {1}: {2} rows have no {1} - set them before partitioning".format(
+            table_name, column, nulls))
+    old_table = table_name + '_unpartitioned'
+    start = connection.execute(text("SELECT min({0}) FROM {1}".format(column, table_name))).scalar() or end
+    connection.execute(text("ALTER TABLE {0} RENAME TO {1}".format(table_name, old_table)))
+    connection.execute(text("CREATE TABLE {0} (LIKE {1} INCLUDING DEFAULTS) PARTITION BY RANGE ({2})".format(
+        table_name, old_table, column)))
+    connection.execute(text("CREATE TABLE {0}_pdefault PARTITION OF {0} DEFAULT".format(table_name)))
+    create_partitions(connection, table_name, start, end)
+    connection.execute(text("INSERT INTO {0} SELECT * FROM {1}".format(table_name, old_table)))
+    # move the id sequence to the new table so it is not dropped with the old one
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table_name, :column)"),
+                                  {'table_name': old_table, 'column': primary_key}).scalar()
+    if sequence:
+        connection.execute(text("ALTER SEQUENCE {0} OWNED BY {1}.{2}".format(sequence, table_name, primary_key)))
+    connection.execute(text("DROP TABLE {0}".format(old_table)))
+    connection.execute(text("ALTER TABLE {0} ADD CONSTRAINT {0}_pkey PRIMARY KEY ({1}, {2})".format(
+        table_name, primary_key, column)))
@@ -0,0 +1,63 @@
+"""
+repository.utils.retention - Enforce the retention periods of the log tables
+
+Retention periods are in days.  The import log tables use the stage_retention_period (stage and file download
+logs) and ods_retention_period (ODS logs) of their ImportDefinition, sources without a period are kept.  The
+data warehouse and export log tables have no per definition period and are only purged when
+default_retention_period is provided.
+
+Version History:
+0.1 agent 10/18/2026
+    Initial Version
+"""
+from datetime import datetime, timedelta
+
+from repository.operators import (ImportDefinitionOperator, ImportStageLogOperator, ImportODSLogOperator,
+                                  ImportFileDownloadLogOperator, DataWarehouseDFLogOperator,
+                                  DataWarehouseARLogOperator, ExportLogOperator)
+
+__version__ = "0.1"
+__date__ = '10/18/2026'
+__updated__ = '10/18/2026'
+__all__ = ['apply_retention']
+
+# log table operator -> ImportDefinition column holding its retention period
+source_retention_operators = [(ImportStageLogOperator, 'stage_retention_period'),
+                              (ImportFileDownloadLogOperator, 'stage_retention_period'),
+                              (ImportODSLogOperator, 'ods_retention_period')]
+default_retention_operators = [DataWarehouseDFLogOperator, DataWarehouseARLogOperator, ExportLogOperator]
+
+
+def apply_retention(dry_run=False, archive=False, chunk_size=None, sleep_seconds=0, default_retention_period=None,
+                    now=None):
+    """
+    Remove the log records older than their retention period
+    :param dry_run: only count the records which would be removed
+    :param archive: copy the records to <table>_archive before deleting them
+    :param chunk_size: records per transaction - defaults to the operator's purge_chunk_size
+    :param sleep_seconds: pause between chunks to limit the load on the database
+    :param default_retention_period: days to keep the data warehouse and export logs - None keeps them
+    :param now: datetime the periods are counted back from - defaults to now
+    :return: dictionary of table name and number of records removed (or which would be removed)
+    """
+    now = now or datetime.now()
+    purge_args = {'archive': archive, 'dry_run': dry_run, 'chunk_size': chunk_size, 'sleep_seconds': sleep_seconds}
+    sources = ImportDefinitionOperator().select_rows(columns=['id', 'stage_retention_period',
+                                                              'ods_retention_period'])
+    summary = {}
+    for operator_class, period_column in source_retention_operators:
+        # one purge per distinct period so sources sharing a period are removed together
+        periods = {}
+        for source in sources:
+            if source[period_column] is not None:
+                periods.setdefault(source[period_column], []).append(source['id'])
+        log_operator = operator_class()
+        summary[log_operator.db_table_class.__tablename__] = sum(
+            log_operator.purge(now - timedelta(days=period), source_ids=source_ids, **purge_args)
+            for period, source_ids in sorted(periods.items()))
+    if default_retention_period is not None:
+        for operator_class in default_retention_operators:
+            log_operator = operator_class()
+            summary[log_operator.db_table_class.__tablename__] = log_operator.purge(
+                now - timedelta(days=default_retention_period), **purge_args)
+    return summary
@@ -32,10 +32,14 @@ setup(
         'Programming Language :: Python :: 2.7',
         'Programming Language :: Python :: 2 :: Only'
     ],
-    install_requires=['SQLAlchemy',
+    install_requires=['SQLAlchemy>=1.4.33',
                       'pycrypto==2.6.1',
-                      'alembic'
+                      'alembic',
+                      'futures; python_version < "3"',
+                      'scandir; python_version < "3.5"'
                       ],
+    extras_require={'async': ['asyncpg'],
+                    'test': ['pytest', 'aiosqlite']},
     include_package_data=False,
     entry_points={},
     scripts=[]
@@ -0,0 +1,26 @@
+"""
+tests/conftest.py - Fixtures for the repository tests
+
+Every test runs against its own SQLite database file so the tests need no PostgreSQL server.
+"""
+import os
+
+os.environ.setdefault('SQLALCHEMY_SILENCE_UBER_WARNING', '1')
+
+import pytest  # noqa: E402
+
+import repository  # noqa: E402
+from repository.metadata.models import ModelBase  # noqa: E402
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    Configure the engine for an empty SQLite database with all tables created
+    :return: database url
+    """
+    url = 'sqlite:///{0}'.format(tmp_path / 'mdrepo.db')
+    repository.configure(url=url)
+    ModelBase.metadata.create_all(repository.get_engine())
+    yield url
+    repository.configure()
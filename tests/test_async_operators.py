@@ -0,0 +1,25 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiosqlite')
+
+from repository.async_connection import configure_async  # noqa: E402
+from repository.operators.async_operators import AsyncImportStageLogOperator  # noqa: E402
+
+
+def test_async_operators_on_aiosqlite(database):
+    configure_async(url=database.replace('sqlite://', 'sqlite+aiosqlite://'))
+
+    async def run():
+        operator = AsyncImportStageLogOperator()
+        await asyncio.gather(*[operator.update(source_id=1, run_id='2026101{0}000000'.format(day), status='new')
+                               for day in range(3)])
+        return await operator.get_max_run_id(1), await operator.select(source_id=1)
+
+    try:
+        max_run_id, records = asyncio.run(run())
+    finally:
+        configure_async()
+    assert max_run_id == 20261012000000
+    assert len(records) == 3
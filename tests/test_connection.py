@@ -0,0 +1,91 @@
+import os
+
+import pytest
+from sqlalchemy import text
+
+import repository
+from repository.operators import ImportDefinitionOperator
+
+
+def test_unit_of_work_commits_all_calls(database):
+    with repository.unit_of_work():
+        ImportDefinitionOperator().update(source_name='a')
+        ImportDefinitionOperator().update(source_name='b')
+    assert ImportDefinitionOperator().count() == 2
+
+
+def test_unit_of_work_rolls_back_all_calls(database):
+    with pytest.raises(RuntimeError):
+        with repository.unit_of_work():
+            ImportDefinitionOperator().update(source_name='a')
+            raise RuntimeError("load failed")
+    assert ImportDefinitionOperator().count() == 0
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="requires os.fork")
+def test_forked_child_gets_its_own_engine(database):
+    parent_pool = repository.get_engine().pool
+    with repository.get_engine().connect() as connection:
+        connection.execute(text('SELECT 1'))
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        status = 1
+        try:
+            engine = repository.get_engine()
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            status = 0 if engine.pool is not parent_pool else 2
+        finally:
+            os.write(write_end, str(status).encode())
+            os._exit(0)
+    os.close(write_end)
+    status = os.read(read_end, 1)
+    os.waitpid(pid, 0)
+    assert status == b'0'
+
+
+def test_write_after_failed_unit_of_work_is_committed(database):
+    operator = ImportDefinitionOperator()
+    with pytest.raises(Exception):
+        with repository.unit_of_work():
+            operator.update(source_name='a')
+            operator.select(no_such_column=1)
+    assert operator.session is None
+    record = operator.update(source_name='b')
+    assert record['id'] is not None
+    assert [row['source_name'] for row in ImportDefinitionOperator().select_rows(columns=['source_name'])] == ['b']
+
+
+def test_session_left_from_ended_unit_of_work_is_not_reused(database):
+    operator = ImportDefinitionOperator()
+    with repository.unit_of_work() as unit_of_work:
+        operator.get_session()
+        assert operator.session is unit_of_work.session
+    operator.update(source_name='a')
+    assert ImportDefinitionOperator().count() == 1
+
+
+def test_memory_sqlite_is_shared_by_threads():
+    from repository.metadata.models import ModelBase
+    repository.configure(url='sqlite://')
+    try:
+        ModelBase.metadata.create_all(repository.get_engine())
+        operator = ImportDefinitionOperator()
+        operator.bulk_update([{'source_name': name} for name in ('a', 'b', 'c')])
+        records = operator.map_select([{'source_name': name} for name in ('a', 'b', 'c')], max_workers=3)
+        assert [record['source_name'] for record in records] == ['a', 'b', 'c']
+        assert repository.connection.get_pool_capacity() == 1
+    finally:
+        repository.configure()
+
+
+def test_deprecated_module_attributes(database, monkeypatch):
+    import repository.connection
+    monkeypatch.setenv('MDREPO_DB_URL', database)
+    with pytest.warns(DeprecationWarning):
+        assert repository.connection.repo_engine is repository.get_engine()
+    with pytest.warns(DeprecationWarning):
+        assert repository.METADATA_DATABASE_URL == database
+    with pytest.raises(AttributeError):
+        repository.connection.no_such_attribute
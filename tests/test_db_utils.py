@@ -0,0 +1,23 @@
+import json
+from datetime import date, datetime
+
+from repository.utils.db_utils import copy_rows, copy_text
+
+
+def test_copy_text_escapes_values():
+    rows = [{'name': 'tab\there\\', 'dt': datetime(2026, 10, 18, 1, 2, 3), 'day': date(2026, 10, 18),
+             'payload': {'a': 'line\nbreak'}},
+            {'name': None, 'count': 3, 'payload': None}]
+    text = copy_text(rows, ['name', 'dt', 'day', 'count', 'payload'], encoders={'payload': json.dumps})
+    assert text == ('tab\\there\\\\\t2026-10-18 01:02:03\t2026-10-18\t\\N\t{"a": "line\\\\nbreak"}\n'
+                    '\\N\t\\N\t\\N\t3\t\\N\n')
+
+
+def test_copy_rows_sends_one_copy_statement():
+    class Cursor(object):
+        def copy_expert(self, sql, stream):
+            self.sql, self.data = sql, stream.read()
+
+    cursor = Cursor()
+    copy_rows(cursor, 'event', ['event_name', 'event_type'], [{'event_name': 'a', 'event_type': 'b'}])
+    assert (cursor.sql, cursor.data) == ('COPY event (event_name, event_type) FROM STDIN', 'a\tb\n')
@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm.exc import NoResultFound
+
+import repository
+from repository.operators import DataWarehouseDefinitionOperator
+from repository.metadata.models import DataWarehouseDefinition, ImportDefinition
+
+
+@pytest.fixture
+def dw_tables(database):
+    session = repository.get_sessionmaker()()
+    sources = [ImportDefinition(source_name='source_{0}'.format(number)) for number in range(3)]
+    session.add_all([DataWarehouseDefinition(table_name='fact_{0}'.format(number), sources=sources[number:])
+                     for number in range(3)])
+    session.commit()
+    session.close()
+
+
+def test_get_table_list_loads_tables_and_sources_in_two_queries(dw_tables):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = repository.get_engine()
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        tables = DataWarehouseDefinitionOperator().get_table_list(['fact_2', 'fact_0', 'fact_1'])
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+    assert len(statements) == 2
+    assert [table['table_name'] for table in tables] == ['fact_2', 'fact_0', 'fact_1']
+    assert [sorted(source['source_name'] for source in table['sources']) for table in tables] == \
+        [['source_2'], ['source_0', 'source_1', 'source_2'], ['source_1', 'source_2']]
+
+
+def test_get_table_list_reports_every_missing_table(dw_tables):
+    with pytest.raises(NoResultFound) as error:
+        DataWarehouseDefinitionOperator().get_table_list(['fact_0', 'missing_a', 'missing_b'])
+    assert 'missing_a, missing_b' in str(error.value)
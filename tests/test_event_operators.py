@@ -0,0 +1,38 @@
+import gc
+import threading
+import weakref
+
+from repository.operators import EventOperator, EventWriter
+from repository.operators import event_operators
+
+
+def test_closed_writer_is_released(database):
+    writer = EventWriter(flush_interval=0.05)
+    assert writer in event_operators._open_writers
+    writer.write(event_category='test', event_type='closed')
+    writer.close()
+    assert writer not in event_operators._open_writers
+    reference = weakref.ref(writer)
+    del writer
+    gc.collect()
+    assert reference() is None
+
+
+def test_writes_racing_close_are_written_or_dropped(database):
+    writer = EventWriter(flush_size=10, flush_interval=0.01)
+    results = []
+
+    def write():
+        for number in range(200):
+            results.append(writer.write(event_category='test', event_type='race', event_name=str(number)))
+
+    threads = [threading.Thread(target=write) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    writer.close()
+    for thread in threads:
+        thread.join()
+    stats = writer.stats()
+    assert stats['pending'] == 0
+    assert stats['written'] == results.count(True) == EventOperator().count(event_type='race')
+    assert stats['dropped'] == results.count(False)
@@ -0,0 +1,61 @@
+import os
+import time
+
+from repository.operators.file_cleanup_operator import FileCleanupRuleMatcher
+from repository.utils.file_cleanup import FileCleanupExecutor
+
+old = time.time() - 10 * 86400
+
+
+def make_file(path, mtime=old):
+    if not os.path.isdir(os.path.dirname(path)):
+        os.makedirs(os.path.dirname(path))
+    with open(path, 'w') as f:
+        f.write('x')
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def archive_rule(rule_id, path, archive_path, **kwargs):
+    return dict({'rule_id': rule_id, 'path': path, 'filename_pattern': '', 'cleanup_action': 'A',
+                 'archive_path': archive_path, 'retention_period': 1, 'recursive_flg': True}, **kwargs)
+
+
+def test_archive_path_under_a_recursive_rule_is_not_scanned(tmp_path):
+    data = str(tmp_path / 'data')
+    archive = os.path.join(data, 'archive')
+    make_file(os.path.join(data, 'a.log'))
+    make_file(os.path.join(archive, '20261001', 'b.log'))
+    matcher = FileCleanupRuleMatcher([archive_rule(1, data, archive, date_append_flg=True)])
+    assert not matcher.descends_into(archive)
+    assert matcher.match(os.path.join(archive, 'c.log')) is None
+    plan = FileCleanupExecutor(matcher=matcher).plan()
+    assert [candidate['path'] for candidate in plan] == [os.path.join(data, 'a.log')]
+
+
+def test_rule_of_the_archive_path_applies_to_archived_files(tmp_path):
+    data = str(tmp_path / 'data')
+    archive = os.path.join(data, 'archive')
+    archived = make_file(os.path.join(archive, '20261001', 'b.log'))
+    rules = [archive_rule(1, data, archive),
+             {'rule_id': 2, 'path': archive, 'filename_pattern': '', 'cleanup_action': 'D', 'retention_period': 5,
+              'recursive_flg': True}]
+    matcher = FileCleanupRuleMatcher(rules)
+    assert matcher.descends_into(os.path.join(archive, '20261001'))
+    plan = FileCleanupExecutor(matcher=matcher).plan()
+    assert [(candidate['path'], candidate['action']) for candidate in plan] == [(archived, 'delete')]
+
+
+def test_archiving_does_not_overwrite_archived_files(tmp_path):
+    data = str(tmp_path / 'data')
+    archive = str(tmp_path / 'archive')
+    existing = make_file(os.path.join(archive, 'a.log'))
+    make_file(os.path.join(data, 'a.log'))
+    make_file(os.path.join(data, 'sub', 'a.log'))
+    executor = FileCleanupExecutor(matcher=FileCleanupRuleMatcher([archive_rule(1, data, archive)]))
+    results = [FileCleanupExecutor._apply(candidate) for candidate in executor.plan()]
+    assert [status for candidate, status in results] == ['archived', 'archived']
+    targets = sorted(candidate['target'] for candidate, status in results)
+    assert targets == [os.path.join(archive, 'a.1.log'), os.path.join(archive, 'a.2.log')]
+    assert sorted(os.listdir(archive)) == ['a.1.log', 'a.2.log', 'a.log']
+    assert os.path.exists(existing) and not os.listdir(os.path.join(data, 'sub'))
@@ -0,0 +1,51 @@
+from datetime import date
+from io import StringIO
+
+from repository.operators import HdfsDiskUsageOperator, HdfsDiskUsageRollupOperator
+
+rollup_columns = ['period', 'period_start_dt', 'path', 'snapshot_count', 'last_dt', 'file_count', 'length',
+                  'max_length', 'length_sum', 'avg_length']
+
+
+def snapshot(*usage):
+    return StringIO("".join("none inf none inf 1 {0} {1} {2}\n".format(files, length, path)
+                            for path, files, length in usage))
+
+
+def rollups():
+    return [dict((column, row[column]) for column in rollup_columns) for row in
+            HdfsDiskUsageRollupOperator().select_rows(order_by=['period', 'path', 'period_start_dt'])]
+
+
+def test_incremental_rollups_match_rebuild(database):
+    operator = HdfsDiskUsageOperator()
+    operator.load_snapshot(snapshot(('/data', 4, 100), ('/data/a', 2, 60)), date(2026, 10, 6))
+    operator.load_snapshot(snapshot(('/data', 5, 400), ('/data/b', 1, 10)), date(2026, 10, 8))
+    # an earlier day loaded late must not replace the latest counts
+    operator.load_snapshot(snapshot(('/data', 9, 200)), date(2026, 10, 7))
+    incremental = rollups()
+    data = [row for row in incremental if row['path'] == '/data' and row['period'] == 'week'][0]
+    assert (data['snapshot_count'], data['last_dt'], data['file_count']) == (3, date(2026, 10, 8), 5)
+    assert (data['max_length'], data['length_sum'], data['avg_length']) == (400, 700, 233)
+    operator.rebuild_rollups()
+    assert rollups() == incremental
+
+
+def test_replaced_day_recomputes_rollups(database):
+    operator = HdfsDiskUsageOperator()
+    operator.load_snapshot(snapshot(('/data', 4, 100)), date(2026, 10, 6))
+    operator.load_snapshot(snapshot(('/data', 4, 300)), date(2026, 10, 7))
+    assert operator.load_snapshot(snapshot(('/data', 4, 50)), date(2026, 10, 7))['replaced'] == 1
+    data = [row for row in rollups() if row['period'] == 'week'][0]
+    assert (data['snapshot_count'], data['max_length'], data['avg_length']) == (2, 100, 75)
+
+
+def test_top_growers_leaves_out_paths_without_the_metric(database):
+    operator = HdfsDiskUsageOperator()
+    # the space quota of /open is removed between the snapshots
+    lines = ['none inf 1000 900 1 1 0 /quota\n', 'none inf 1000 900 1 1 0 /open\n']
+    operator.load_snapshot(StringIO(''.join(lines)), date(2026, 10, 6), rollup=False)
+    lines = ['none inf 1000 500 1 1 0 /quota\n', 'none inf none inf 1 1 0 /open\n']
+    operator.load_snapshot(StringIO(''.join(lines)), date(2026, 10, 7), rollup=False)
+    growers = operator.top_growers(date(2026, 10, 6), date(2026, 10, 7), n=2, metric='space_consumed_bytes')
+    assert [(row['path'], row['growth'], row['rank']) for row in growers] == [('/quota', 400, 1)]
@@ -0,0 +1,27 @@
+import pytest
+
+from repository.operators import (ImportDefinitionOperator, ImportFileDownloadLogOperator, ImportStageLogOperator,
+                                  ImportODSLogOperator)
+
+
+def test_pending_file_downloads_pages(database):
+    source = ImportDefinitionOperator().update(source_group_name='dcm', source_name='a')
+    other = ImportDefinitionOperator().update(source_group_name='other', source_name='b')
+    downloads = ImportFileDownloadLogOperator()
+    downloads.bulk_update([{'source_id': source['id'], 'run_id': '1', 'filename': 'f{0}'.format(number),
+                            'status': 'complete'} for number in range(5)] +
+                          [{'source_id': other['id'], 'run_id': '1', 'filename': 'g', 'status': 'complete'}])
+    ImportStageLogOperator().update(source_id=source['id'], run_id='1', realized_source_name='f1', status='complete')
+    pages = [downloads.get_pending_file_downloads('dcm', limit=2)]
+    while pages[-1]['next_cursor']:
+        pages.append(downloads.get_pending_file_downloads('dcm', limit=2, cursor=pages[-1]['next_cursor']))
+    assert [[record['filename'] for record in page['records']] for page in pages] == [['f0', 'f2'], ['f3', 'f4']]
+    assert len(downloads.get_pending_file_downloads(limit=10)['records']) == 5
+
+
+def test_pending_file_downloads_rejects_bad_limits_and_cursors(database):
+    downloads = ImportFileDownloadLogOperator()
+    with pytest.raises(ValueError):
+        downloads.get_pending_file_downloads(limit=0)
+    with pytest.raises(ValueError):
+        downloads.get_pending_file_downloads(cursor=ImportODSLogOperator().encode_cursor(1))
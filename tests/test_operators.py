@@ -0,0 +1,197 @@
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import Column, MetaData, Table, select, text
+
+import repository
+from repository.metadata.models import to_run_key
+from repository.operators import (HdfsDiskUsageRollupOperator, ImportDefinitionOperator, ImportODSLogOperator,
+                                  ImportStageLogOperator)
+
+
+def test_claim_without_skip_locked(database):
+    operator = ImportStageLogOperator()
+    operator.bulk_update([{'source_id': 1, 'run_id': str(run_id), 'status': 'pending'} for run_id in range(5)])
+    first = operator.claim(3, 'pending', 'running', 'worker-1')
+    second = operator.claim(3, 'pending', 'running', 'worker-2')
+    assert len(first) == 3 and len(second) == 2
+    assert not set(record['id'] for record in first) & set(record['id'] for record in second)
+    assert operator.claim(3, 'pending', 'running', 'worker-3') == []
+    released = operator.release([record['id'] for record in first], 'complete', 'worker-2')
+    assert released == []
+    assert len(operator.release([record['id'] for record in first], 'complete', 'worker-1')) == 3
+
+
+def test_expired_lease_is_claimed_again(database):
+    operator = ImportStageLogOperator()
+    operator.update(source_id=1, run_id='1', status='pending')
+    assert len(operator.claim(1, 'pending', 'running', 'worker-1', lease_seconds=-1)) == 1
+    claimed = operator.claim(1, 'pending', 'running', 'worker-2')
+    assert [record['claimed_by'] for record in claimed] == ['worker-2']
+
+
+def test_definition_cache_revalidates_unchanged_records(database):
+    ImportDefinitionOperator.enable_cache(ttl=0)
+    try:
+        operator = ImportDefinitionOperator()
+        operator.update(source_name='a')
+        assert operator.select_one(source_name='a')['source_name'] == 'a'
+        assert operator.select_one(source_name='a')['source_name'] == 'a'
+        assert ImportDefinitionOperator.cache_stats()['revalidations'] == 1
+    finally:
+        ImportDefinitionOperator.disable_cache()
+
+
+def test_definition_cache_revalidates_select_first_with_many_matches(database):
+    ImportDefinitionOperator.enable_cache(ttl=0)
+    try:
+        operator = ImportDefinitionOperator()
+        operator.bulk_update([{'source_name': 'a', 'source_group_name': 'g'},
+                              {'source_name': 'b', 'source_group_name': 'g'}])
+        first = operator.select_first(source_group_name='g', order_by='id')
+        assert operator.select_first(source_group_name='g', order_by='id') == first
+        assert operator.select_first(source_group_name='g', order_by='id') == first
+        assert ImportDefinitionOperator.cache_stats()['revalidations'] == 2
+    finally:
+        ImportDefinitionOperator.disable_cache()
+
+
+def test_purge_archives_the_columns_of_an_older_archive_table(database):
+    operator = ImportStageLogOperator()
+    operator.bulk_update([{'source_id': 1, 'run_id': str(run_id), 'status': 'complete'} for run_id in range(3)])
+    table = operator.db_table_class.__table__
+    # an archive table created before run_key was added to the log table
+    older = Table(table.name + '_archive', MetaData(),
+                  *[Column(column.name, column.type) for column in table.c if column.name != 'run_key'])
+    older.create(bind=repository.get_engine())
+    assert operator.purge(datetime.now() + timedelta(days=1), archive=True) == 3
+    assert operator.count() == 0
+    archive_table = operator.get_archive_table()
+    assert 'run_key' not in archive_table.c
+    with repository.get_engine().connect() as connection:
+        assert sorted(row.run_id for row in connection.execute(select(archive_table))) == ['0', '1', '2']
+
+
+def test_filter_lookups_count_and_exists(database):
+    operator = ImportStageLogOperator()
+    assert operator.count() == 0
+    assert not operator.exists()
+    operator.bulk_update([{'source_id': source_id, 'run_id': str(source_id), 'status': status}
+                          for source_id, status in enumerate(['new', 'new', 'running', None, 'complete'])])
+    assert operator.count() == 5
+    assert operator.exists()
+    assert operator.count(status='new') == 2
+    assert operator.count(status__ne='new') == 2
+    assert operator.count(source_id__lt=1) == 1
+    assert operator.count(source_id__lte=1) == 2
+    assert operator.count(source_id__gt=3) == 1
+    assert operator.count(source_id__gte=3) == 2
+    assert operator.count(status__in=['running', 'complete']) == 2
+    assert operator.count(status__notin=['new']) == 2
+    assert operator.count(source_id__between=(1, 3)) == 3
+    assert operator.count(status__like='run%') == 1
+    assert operator.count(status__ilike='NEW') == 2
+    assert operator.count(status__startswith='comp') == 1
+    assert operator.count(status__isnull=True) == 1
+    assert operator.exists(status='running')
+    assert not operator.exists(status='failed')
+    assert [row['source_id'] for row in operator.select_rows(['source_id'], order_by='-source_id', limit=2,
+                                                                status__isnull=False)] == [4, 2]
+
+
+def test_filter_clauses_reject_unknown_names(database):
+    operator = ImportStageLogOperator()
+    with pytest.raises(ValueError):
+        operator.count(status__contains='new')
+    with pytest.raises(ValueError):
+        operator.exists(no_such_column=1)
+
+
+def test_run_key_of_rows_inserted_outside_the_orm(database):
+    operator = ImportStageLogOperator()
+    with repository.get_engine().begin() as connection:
+        connection.execute(text("INSERT INTO import_stage_log (source_id, run_id) VALUES "
+                                "(1, '20261017000000'), (1, '123456789012345678901234'), (1, 'manual')"))
+    keys = dict((row['run_id'], row['run_key']) for row in operator.select_rows(['run_id', 'run_key']))
+    assert keys == {'20261017000000': 20261017000000, '123456789012345678901234': None, 'manual': None}
+    with repository.get_engine().begin() as connection:
+        connection.execute(text("UPDATE import_stage_log SET run_id = '20261018000000' WHERE run_id = 'manual'"))
+    assert operator.get_max_run_id(1) == 20261018000000
+
+
+def test_run_id_outside_the_bigint_range_has_no_run_key(database):
+    assert to_run_key('9223372036854775807') == 9223372036854775807
+    assert to_run_key('9223372036854775808') is None
+    assert to_run_key(' 20261018000000 ') == 20261018000000
+    record = ImportStageLogOperator().update(source_id=1, run_id='123456789012345678901234')
+    assert record['run_key'] is None
+
+
+def test_get_max_run_ids(database):
+    operator = ImportStageLogOperator()
+    operator.bulk_update([{'source_id': source_id, 'run_id': run_id} for source_id, run_id in
+                          [(1, '20261016000000'), (1, '20261018000000'), (2, '20261015000000'), (2, 'manual')]])
+    assert operator.get_max_run_ids([1, 2, 3]) == {1: 20261018000000, 2: 20261015000000, 3: None}
+    assert operator.get_max_run_ids([1, 2, 3], date_filter='20261017000000') == {1: 20261016000000,
+                                                                                   2: 20261015000000, 3: None}
+    assert operator.get_max_run_ids([2], date_filter='20261014000000') == {2: None}
+    assert operator.get_max_run_ids([]) == {}
+
+
+def test_bulk_update_merges_records_with_the_same_conflict_keys(database):
+    operator = ImportStageLogOperator()
+    record = operator.update(source_id=1, run_id='1', status='new')
+    results = operator.bulk_update([{'id': record['id'], 'status': 'a'}, {'id': record['id'], 'status': 'b'},
+                                    {'id': record['id'] + 1, 'source_id': 2, 'status': 'c'}], chunk_size=1)
+    assert [result['status'] for result in results] == ['b', 'b', 'c']
+    assert results[0]['run_id'] == '1'
+    assert sorted(row['status'] for row in operator.select_rows(['status'])) == ['b', 'c']
+
+
+def test_bulk_update_without_upsert_uses_the_conflict_keys(database):
+    operator = HdfsDiskUsageRollupOperator()
+    operator.upsert_dialects = ()
+    keys = ('period', 'path', 'period_start_dt')
+    first = operator.bulk_update([{'period': 'week', 'path': '/data', 'period_start_dt': date(2026, 10, 5),
+                                   'length': 1}], conflict_keys=keys)
+    second = operator.bulk_update([{'period': 'week', 'path': '/data', 'period_start_dt': date(2026, 10, 5),
+                                    'length': 2},
+                                   {'period': 'week', 'path': '/data/a', 'period_start_dt': date(2026, 10, 5),
+                                    'length': 3}], conflict_keys=keys)
+    assert second[0]['id'] == first[0]['id'] and second[0]['length'] == 2
+    assert operator.count() == 2
+
+
+def test_page_cursor_round_trip(database):
+    operator = ImportStageLogOperator()
+    operator.bulk_update([{'source_id': source_id % 2, 'run_id': str(source_id)} for source_id in range(7)])
+    pages = [operator.page(limit=2, source_id=0)]
+    while pages[-1]['next_cursor']:
+        pages.append(operator.page(limit=2, cursor=pages[-1]['next_cursor'], source_id=0))
+    assert [[record['run_id'] for record in page['records']] for page in pages] == [['0', '2'], ['4', '6']]
+    assert operator.page(limit=3)['next_cursor'] == operator.encode_cursor(3)
+    assert [record['id'] for record in operator.page(after_id=5)['records']] == [6, 7]
+
+
+def test_page_rejects_bad_limits_and_cursors(database):
+    operator = ImportStageLogOperator()
+    operator.update(source_id=1, run_id='1')
+    for limit in (0, -1):
+        with pytest.raises(ValueError):
+            operator.page(limit=limit)
+    with pytest.raises(ValueError):
+        operator.page(cursor=ImportODSLogOperator().encode_cursor(1))
+    with pytest.raises(ValueError):
+        operator.page(cursor='not a cursor')
+
+
+def test_set_status_many_is_a_compare_and_set(database):
+    operator = ImportStageLogOperator()
+    ids = [record['id'] for record in operator.bulk_update([{'source_id': 1, 'run_id': str(run_id),
+                                                             'status': 'pending'} for run_id in range(3)])]
+    operator.set_status(ids[2], 'failed')
+    assert sorted(operator.set_status_many(ids, 'running', expected_status='pending')) == ids[:2]
+    assert operator.set_status_many(ids, 'running', expected_status='pending') == []
+    assert operator.set_status_many([], 'running') == []
+    assert sorted(operator.set_status_many(ids, 'complete')) == ids
+    assert operator.count(status='complete') == 3
@@ -0,0 +1,22 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import text
+
+import repository
+from repository.utils import partition_utils
+
+
+def test_month_ranges():
+    assert partition_utils.month_ranges(date(2026, 11, 15), date(2027, 1, 1)) == [
+        (date(2026, 11, 1), date(2026, 12, 1)), (date(2026, 12, 1), date(2027, 1, 1)),
+        (date(2027, 1, 1), date(2027, 2, 1))]
+
+
+def test_partition_table_rejects_null_partition_column(database):
+    with repository.get_engine().begin() as connection:
+        connection.execute(text("CREATE TABLE legacy_event (id INTEGER PRIMARY KEY, event_dttm TIMESTAMP)"))
+        connection.execute(text("INSERT INTO legacy_event (event_dttm) VALUES ('2026-10-01 00:00:00'), (NULL)"))
+    with pytest.raises(ValueError, match='1 rows have no event_dttm'):
+        with repository.get_engine().begin() as connection:
+            partition_utils.partition_table(connection, 'legacy_event', 'event_dttm', 'id', date(2026, 12, 1))
@@ -0,0 +1,53 @@
+import pickle
+from datetime import datetime
+
+from sqlalchemy import delete
+
+import repository
+
+from repository.metadata.models import WorkflowConfig
+from repository.operators import WorkflowConfigOperator
+
+
+class CountingPickler(object):
+    loads_count = 0
+
+    @classmethod
+    def loads(cls, value):
+        cls.loads_count += 1
+        return pickle.loads(value)
+
+    @staticmethod
+    def dumps(value, protocol=None):
+        return pickle.dumps(value, protocol)
+
+
+def test_workflow_parameters_are_unpickled_once_per_change(database, monkeypatch):
+    monkeypatch.setattr(WorkflowConfig.__table__.c.parameter_value.type, 'pickler', CountingPickler)
+    monkeypatch.setattr(WorkflowConfigOperator, 'parameter_values', {})
+    operator = WorkflowConfigOperator()
+    record = operator.update(workflow_name='load', parameter_name='tables', parameter_value=['a', 'b'])
+    operator.update(workflow_name='load', parameter_name='retries', parameter_value=3)
+    CountingPickler.loads_count = 0
+    first = operator.get_workflow_parameters('load')
+    assert first == {'tables': ['a', 'b'], 'retries': 3}
+    assert CountingPickler.loads_count == 2
+    first['tables'].append('c')
+    assert operator.get_workflow_parameters('load')['tables'] == ['a', 'b']
+    assert CountingPickler.loads_count == 2
+    operator.update(id=record['id'], parameter_value=['x'], modified_dttm=datetime(2030, 1, 1))
+    CountingPickler.loads_count = 0
+    assert operator.get_workflow_parameters('load')['tables'] == ['x']
+    assert CountingPickler.loads_count == 1
+
+
+def test_deleted_workflow_parameters_are_forgotten(database, monkeypatch):
+    monkeypatch.setattr(WorkflowConfigOperator, 'parameter_values', {})
+    operator = WorkflowConfigOperator()
+    record = operator.update(workflow_name='load', parameter_name='tables', parameter_value=['a'])
+    operator.get_workflow_parameters('load')
+    assert list(WorkflowConfigOperator.parameter_values['load']) == [record['id']]
+    with repository.get_engine().begin() as connection:
+        connection.execute(delete(WorkflowConfig.__table__))
+    assert operator.get_workflow_parameters('load') == {}
+    assert 'load' not in WorkflowConfigOperator.parameter_values